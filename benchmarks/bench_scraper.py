@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Offline scraper benchmark
+Serves recorded (or synthetic) source pages from a local HTTP server and
+measures NewsScraper end to end without touching the live sites.
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+import scraper  # noqa: E402
+
+logger = logging.getLogger("benchmark")
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+# Path prefixes tried when a synthetic link has to satisfy a source's link_pattern
+_LINK_PREFIXES = ["/news/", "/content/", "/2024/05/", "/Pages/Details/", "/opinion/"]
+
+def _first_alternative(pattern) -> str:
+    return pattern.pattern.split('|')[0] if pattern is not None else ""
+
+def _synthetic_link(source: scraper.SourceConfig, i: int) -> str:
+    for prefix in _LINK_PREFIXES:
+        href = f"{prefix}story-{i}"
+        if source.link_pattern is None or source.link_pattern.search(href):
+            return href
+    return f"/story-{i}"
+
+def synthetic_page(source: scraper.SourceConfig, items: int = 40, padding_kb: int = 300) -> bytes:
+    """Build a homepage shaped like `source` expects, padded with nav/footer/script noise"""
+    rng = random.Random(source.key)
+    words = ["gaza", "west", "bank", "strike", "aid", "convoy", "hospital", "ceasefire",
+             "talks", "settlers", "village", "families", "report", "minister", "children"]
+    container_class = _first_alternative(source.container_class) or "post"
+    title_class = _first_alternative(source.title_class) or "title"
+    summary_class = _first_alternative(source.summary_class) or "excerpt"
+
+    body = []
+    for i in range(items):
+        title = " ".join(rng.choice(words) for _ in range(8)).capitalize() + f" {i}"
+        href = _synthetic_link(source, i)
+        body.append(
+            f'<article class="{container_class}"><h2 class="{title_class}"><a href="{href}">{title}</a></h2>'
+            f'<p class="{summary_class}">Summary for {title}</p><img src="/img/{i}.jpg"></article>'
+        )
+
+    noise = []
+    while sum(len(chunk) for chunk in noise) < padding_kb * 1024:
+        n = len(noise)
+        noise.append(f'<li class="menu-item"><a href="/tag/{n}">Tag {n}</a><span>{"x" * 40}</span></li>')
+
+    html = (
+        "<!DOCTYPE html><html><head><title>Benchmark</title>"
+        f"<script>{'var cfg = {};' * 500}</script></head><body>"
+        f"<nav><ul>{''.join(noise[:len(noise) // 2])}</ul></nav>"
+        f"<main>{''.join(body)}</main>"
+        f"<footer><ul>{''.join(noise[len(noise) // 2:])}</ul></footer></body></html>"
+    )
+    return html.encode("utf-8")
+
+def synthetic_feed(source: scraper.SourceConfig, items: int = 20) -> bytes:
+    entries = "".join(
+        f"<item><title>{source.name} feed story number {i} about Gaza</title>"
+        f"<link>https://example.org/{source.key}/{i}</link>"
+        f"<description>Summary of story {i}</description>"
+        f"<pubDate>Fri, 16 Oct 2026 {i % 24:02d}:00:00 +0000</pubDate></item>"
+        for i in range(items)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{source.name}</title>{entries}</channel></rss>'.encode("utf-8")
+
+def _fixture_path(source: scraper.SourceConfig, feed: bool) -> str:
+    return os.path.join(FIXTURE_DIR, f"{source.key}.{'feed.xml' if feed else 'html'}")
+
+def load_fixtures(sources: List[scraper.SourceConfig]) -> Dict[str, bytes]:
+    """Map server paths to response bodies, preferring recorded snapshots"""
+    fixtures = {}
+    for source in sources:
+        for feed in (False, True):
+            if feed and not source.feed_url:
+                continue
+            path = _fixture_path(source, feed)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    body = f.read()
+            else:
+                body = synthetic_feed(source) if feed else synthetic_page(source)
+            fixtures[f"/{source.key}/{'feed' if feed else ''}"] = body
+    return fixtures
+
+def record_fixtures(sources: List[scraper.SourceConfig]):
+    """Snapshot the live source pages (and feeds) into the fixtures directory"""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    live = scraper.NewsScraper(max_workers=1)
+    try:
+        for source in sources:
+            for feed, url in ((False, source.url), (True, source.feed_url)):
+                if not url:
+                    continue
+                try:
+                    response = live.fetch(url)
+                    response.raise_for_status()
+                except requests.RequestException as e:
+                    logger.warning(f"Could not record {url}: {e}")
+                    continue
+                with open(_fixture_path(source, feed), "wb") as f:
+                    f.write(response.content)
+                logger.info(f"Recorded {url} ({len(response.content)} bytes)")
+    finally:
+        live.close()
+
+class FixtureServer:
+    """Local HTTP stand-in for the news sites, with optional latency and errors"""
+
+    def __init__(self, fixtures: Dict[str, bytes], latency: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    fail = server._rng.random() < server.error_rate
+                if server.latency:
+                    time.sleep(server.latency)
+
+                body = server.fixtures.get(self.path)
+                if fail or body is None:
+                    self.send_response(503 if fail else 404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml" if self.path.endswith("feed") else "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def local_sources(base_url: str, sources: List[scraper.SourceConfig]) -> List[scraper.SourceConfig]:
+    """Copies of the source registry pointed at the fixture server"""
+    rewritten = []
+    for source in sources:
+        local = copy.copy(source)
+        local.url = f"{base_url}/{source.key}/"
+        local.feed_url = f"{base_url}/{source.key}/feed" if source.feed_url else ""
+        rewritten.append(local)
+    return rewritten
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in KiB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / scale
+
+def run_benchmark(args: argparse.Namespace) -> Dict:
+    fixtures = load_fixtures(scraper.SOURCES)
+    work_dir = tempfile.mkdtemp(prefix="scraper-bench-")
+    results = {"config": {key: value for key, value in vars(args).items() if key != "func"}, "runs": []}
+
+    try:
+        with FixtureServer(fixtures, latency=args.latency, error_rate=args.error_rate) as server:
+            sources = local_sources(server.base_url, scraper.SOURCES)
+
+            # Per-source fetch and parse cost, measured in isolation
+            per_source = {}
+            probe = scraper.NewsScraper(max_workers=1, host_interval=0, early_stop=not args.no_early_stop)
+            for source in sources:
+                started = time.perf_counter()
+                try:
+                    content = probe.fetch(source.url, page_of=source).content
+                except requests.RequestException:
+                    content = b""
+                fetch_s = time.perf_counter() - started
+                started = time.perf_counter()
+                found = scraper.extract_articles(source, content, args.parser)
+                parse_s = time.perf_counter() - started
+                per_source[source.key] = {
+                    "bytes": len(content),
+                    "fetch_ms": round(fetch_s * 1000, 2),
+                    "parse_ms": round(parse_s * 1000, 2),
+                    "articles": len(found)
+                }
+            probe.close()
+            results["sources"] = per_source
+
+            for run in range(args.runs):
+                cache_dir = os.path.join(work_dir, "http-cache")
+                if not args.warm_cache:
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                http_cache = None if args.no_cache else scraper.HTTPCache(cache_dir)
+                bench_scraper = scraper.NewsScraper(
+                    max_workers=args.workers, host_interval=args.host_interval, http_cache=http_cache,
+                    sources=sources, parser=args.parser, parse_workers=args.parse_workers,
+                    use_feeds=not args.no_feeds, early_stop=not args.no_early_stop
+                )
+                requests_before = server.requests
+                started = time.perf_counter()
+                try:
+                    articles = bench_scraper.scrape_all_sources()
+                finally:
+                    bench_scraper.close()
+                scrape_s = time.perf_counter() - started
+
+                started = time.perf_counter()
+                bench_scraper.save_articles_to_json(articles, os.path.join(work_dir, "articles.json"))
+                save_s = time.perf_counter() - started
+
+                results["runs"].append({
+                    "scrape_s": round(scrape_s, 4),
+                    "save_s": round(save_s, 4),
+                    "articles": len(articles),
+                    "articles_per_s": round(len(articles) / scrape_s, 1) if scrape_s else 0.0,
+                    "requests": server.requests - requests_before,
+                    "bytes": sum(metrics.bytes for metrics in bench_scraper.metrics.values())
+                })
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    scrape_times = sorted(run["scrape_s"] for run in results["runs"])
+    results["summary"] = {
+        "end_to_end_s": scrape_times[len(scrape_times) // 2],
+        "save_s": max(run["save_s"] for run in results["runs"]),
+        "max_parse_ms": max(source["parse_ms"] for source in results["sources"].values()),
+        "articles_per_s": min(run["articles_per_s"] for run in results["runs"]),
+        "peak_rss_mb": round(_peak_rss_mb(), 1)
+    }
+    return results
+
+def _article_fields(articles: List[scraper.NewsArticle]) -> List[tuple]:
+    return [(article.title, article.url, article.summary, article.author, article.image_url) for article in articles]
+
+def check_early_stop(parser: str = scraper.DEFAULT_PARSER) -> List[str]:
+    """Check that every source extracts the same articles from an early-stopped download as from the whole page.
+
+    CandidateScanner mirrors each SourceConfig's selectors by hand, so a
+    selector edit it does not follow would otherwise silently drop or cut
+    articles. Pages are read through the real fetch path, once in the
+    default chunk size and once in small chunks to move the cut points.
+    """
+    fixtures = load_fixtures(scraper.SOURCES)
+    failures = []
+    with FixtureServer(fixtures) as server:
+        sources = local_sources(server.base_url, scraper.SOURCES)
+        for chunk_size in (16384, 512):
+            probe = scraper.NewsScraper(max_workers=1, host_interval=0, retries=0)
+            probe.page_chunk_size = chunk_size
+            try:
+                for source in sources:
+                    page = fixtures[f"/{source.key}/"]
+                    metrics = scraper.SourceMetrics(source.key)
+                    prefix = probe.fetch(source.url, metrics=metrics, page_of=source).content
+                    expected = _article_fields(scraper.extract_articles(source, page, parser))
+                    found = _article_fields(scraper.extract_articles(source, prefix, parser))
+                    if found != expected:
+                        failures.append(f"early stop changed {source.key} articles at {chunk_size} byte chunks "
+                                        f"({len(prefix)} of {len(page)} bytes read, {len(found)} articles "
+                                        f"instead of {len(expected)})")
+            finally:
+                probe.close()
+    return failures
+
+def check_thresholds(summary: Dict, thresholds: Dict, baseline: Optional[Dict], max_regression: float) -> List[str]:
+    """Return a description of every threshold or baseline regression that was exceeded"""
+    failures = []
+    for metric, limit in thresholds.get("max", {}).items():
+        if metric in summary and summary[metric] > limit:
+            failures.append(f"{metric}={summary[metric]} exceeds maximum {limit}")
+    for metric, limit in thresholds.get("min", {}).items():
+        if metric in summary and summary[metric] < limit:
+            failures.append(f"{metric}={summary[metric]} below minimum {limit}")
+
+    if baseline:
+        for metric, previous in baseline.get("summary", {}).items():
+            current = summary.get(metric)
+            if current is None or not previous:
+                continue
+            higher_is_better = metric == "articles_per_s"
+            change = (previous - current) / previous if higher_is_better else (current - previous) / previous
+            if change > max_regression:
+                failures.append(f"{metric} regressed {change:.0%} against baseline ({previous} -> {current})")
+    return failures
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against local fixtures")
+    parser.add_argument("--record", action="store_true", help="snapshot the live sources into fixtures/ and exit")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds of injected latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--host-interval", type=float, default=0.0)
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--parser", default=scraper.DEFAULT_PARSER, choices=["lxml", "html.parser"])
+    parser.add_argument("--no-feeds", action="store_true")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--no-early-stop", action="store_true", help="download and parse whole source pages")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the HTTP cache between runs")
+    parser.add_argument("--check-early-stop", action="store_true",
+                        help="only check that early-stopped pages yield the same articles as whole pages, then exit")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="JSON file of min/max limits")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed relative slowdown against --baseline")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    if args.record:
+        record_fixtures(scraper.SOURCES)
+        return 0
+
+    if args.check_early_stop:
+        failures = check_early_stop(args.parser)
+        for failure in failures:
+            logger.error(failure)
+        logger.info(f"Early stop matched whole-page extraction for {len(scraper.SOURCES) - len(failures)} "
+                     f"of {len(scraper.SOURCES)} sources" if not failures else "Early stop check failed")
+        return 1 if failures else 0
+
+    results = run_benchmark(args)
+    thresholds = {}
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    results["failures"] = check_thresholds(results["summary"], thresholds, baseline, args.max_regression)
+    if not args.no_early_stop:
+        results["failures"] += check_early_stop(args.parser)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+    for failure in results["failures"]:
+        logger.error(failure)
+    return 1 if results["failures"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Article serialization benchmark
+Builds a synthetic archive and times creating, loading and saving it, along
+with the memory the loaded NewsArticle objects occupy.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper  # noqa: E402
+
+_WORDS = ("Gaza", "Rafah", "West Bank", "ceasefire", "talks", "aid", "convoy", "strike", "hospital",
+          "families", "displaced", "Jenin", "raid", "UN", "report", "settlers", "olive", "harvest")
+
+def synthetic_archive(count: int, seed: int = 0) -> List[Dict]:
+    """Article dicts spread over the registry's sources, shaped like articles.json"""
+    rng = random.Random(seed)
+    archive = []
+    for i in range(count):
+        source = scraper.SOURCES[i % len(scraper.SOURCES)]
+        title = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 12))) + f" {i}"
+        archive.append({
+            "title": title,
+            "summary": " ".join(rng.choice(_WORDS) for _ in range(30)),
+            "url": f"{source.url.rstrip('/')}/story/{i}",
+            "source": source.name,
+            "author": rng.choice(("", "Staff", "Correspondent")),
+            "publishedAt": f"2024-05-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00+00:00",
+            "imageUrl": f"{source.url.rstrip('/')}/img/{i}.jpg",
+            "tags": list(source.tags),
+            "category": source.category,
+            "priority": source.priority
+        })
+    return archive
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def run_benchmark(count: int) -> Dict:
+    news_scraper = scraper.NewsScraper(parse_workers=0)
+    archive = synthetic_archive(count)
+    workdir = tempfile.mkdtemp(prefix="bench-serialization-")
+    path = os.path.join(workdir, "articles.json")
+    try:
+        articles, create_s = _timed(lambda: [
+            scraper.NewsArticle(
+                title=data["title"], summary=data["summary"], url=data["url"], source=data["source"],
+                author=data["author"], image_url=data["imageUrl"], tags=list(data["tags"]),
+                category=data["category"], priority=data["priority"]
+            ) for data in archive
+        ])
+        start = time.perf_counter()
+        news_scraper.save_articles_to_json(articles, path)
+        save_s = time.perf_counter() - start
+        del articles
+        gc.collect()
+
+        tracemalloc.start()
+        loaded, load_s = _timed(lambda: news_scraper.load_articles_from_json(path))
+        articles_mb = tracemalloc.get_traced_memory()[0] / (1024 * 1024)
+        tracemalloc.stop()
+        # tracemalloc slows allocation down, so time the load again without it
+        del loaded
+        gc.collect()
+        loaded, load_s = _timed(lambda: news_scraper.load_articles_from_json(path))
+
+        _, resave_s = _timed(lambda: news_scraper.save_articles_to_json(loaded, path))
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+    finally:
+        news_scraper.close()
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+
+    return {
+        "articles": count,
+        "create_s": round(create_s, 3),
+        "save_s": round(save_s, 3),
+        "load_s": round(load_s, 3),
+        "resave_s": round(resave_s, 3),
+        "loaded_articles_mb": round(articles_mb, 1),
+        "output_mb": round(size_mb, 1)
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark NewsArticle creation, loading and saving")
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)
+    results = run_benchmark(args.articles)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,7 +38,7 @@ install_dependencies() {
     npm install
     
     echo "Installing Python dependencies..."
-    pip3 install requests beautifulsoup4 feedparser
+    pip3 install requests beautifulsoup4 feedparser lxml orjson pillow brotli
     
     echo "✅ Dependencies installed"
 }
@@ -47,8 +47,7 @@ install_dependencies() {
 initial_scrape() {
     echo "📰 Running initial news scraping..."
     
-    python3 scraper.py
-    cp articles.json public/articles.json
+    python3 scraper.py --sharded-dir public/data --also-write public/articles.json
     
     echo "✅ Initial scraping completed"
 }
@@ -5,23 +5,87 @@ A comprehensive news scraping system for Palestinian news sources
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from bs4 import BeautifulSoup, SoupStrainer
+from html.parser import HTMLParser
 import json
 import hashlib
 import time
-from datetime import datetime, timezone
+import threading
+import argparse
+import random
+import zlib
+import gzip
+import sqlite3
+import signal
+import tempfile
+import gc
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
 import re
 import logging
 from urllib.parse import urljoin, urlparse
 import os
-from typing import List, Dict, Optional
+import io
+import sys
+import unicodedata
+from typing import List, Dict, Iterable, Iterator, Optional, Set, Tuple
 import feedparser
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+_TAG_TUPLES: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+def _intern_tags(tags: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """Share one tuple per distinct tag list instead of a list per article"""
+    key = tuple(tags) if tags else ()
+    interned = _TAG_TUPLES.get(key)
+    if interned is None:
+        interned = _TAG_TUPLES[key] = tuple(sys.intern(tag) for tag in key)
+    return interned
+
+@contextmanager
+def _gc_paused():
+    """Suspend cyclic GC while bulk-building acyclic objects.
+
+    Every allocation would otherwise count towards a collection that
+    rescans the whole growing archive, which costs more than the decoding.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
 class NewsArticle:
+    __slots__ = ("id", "title", "summary", "url", "source", "author", "published_at", "scraped_at",
+                 "image_url", "image_sources", "tags", "category", "priority", "related_sources")
+
+    # Shared by every article created in the current run; see start_run()
+    _run_timestamp: Optional[str] = None
+
     def __init__(self, title: str, summary: str, url: str, source: str, 
                  author: str = "", published_at: str = "", image_url: str = "", 
                  tags: List[str] = None, category: str = "news", priority: int = 1):
@@ -29,20 +93,69 @@ class NewsArticle:
         self.title = title.strip()
         self.summary = summary.strip()
         self.url = url
-        self.source = source
+        self.source = sys.intern(source)
         self.author = author
-        self.published_at = published_at or datetime.now(timezone.utc).isoformat()
-        self.scraped_at = datetime.now(timezone.utc).isoformat()
+        self.scraped_at = self.run_timestamp()
+        self.published_at = published_at or self.scraped_at
         self.image_url = image_url
-        self.tags = tags or []
-        self.category = category
+        # srcset per MIME type once the image is served as local thumbnails
+        self.image_sources: Dict[str, str] = {}
+        self.tags = _intern_tags(tags)
+        self.category = sys.intern(category)
         self.priority = priority
+        self.related_sources: List[Dict[str, str]] = []
 
-    def _generate_id(self, title: str, url: str) -> str:
+    @classmethod
+    def start_run(cls, timestamp: Optional[str] = None) -> str:
+        """Stamp articles created from now on with this run's time (default: now)"""
+        cls._run_timestamp = timestamp or datetime.now(timezone.utc).isoformat()
+        return cls._run_timestamp
+
+    @classmethod
+    def run_timestamp(cls) -> str:
+        return cls._run_timestamp or cls.start_run()
+
+    @staticmethod
+    def _generate_id(title: str, url: str) -> str:
         """Generate unique ID based on title and URL"""
         content = f"{title}{url}"
         return hashlib.md5(content.encode()).hexdigest()
 
+    def add_related(self, other: "NewsArticle"):
+        """Record another article (and anything it absorbed) as covering the same story"""
+        known_urls = {self.url} | {related["url"] for related in self.related_sources}
+        for related in [{"source": other.source, "url": other.url}] + other.related_sources:
+            # Related coverage is by definition another outlet's
+            if related["source"] == self.source:
+                continue
+            if related["url"] not in known_urls:
+                known_urls.add(related["url"])
+                self.related_sources.append(related)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "NewsArticle":
+        """Rebuild an article from its to_dict() representation.
+
+        Skips __init__: saved articles already carry their id and timestamps,
+        so only missing fields are hashed or stamped.
+        """
+        article = cls.__new__(cls)
+        article.title = data["title"]
+        article.url = data["url"]
+        article.id = data.get("id") or cls._generate_id(article.title, article.url)
+        article.summary = data.get("summary", "")
+        article.source = sys.intern(data["source"])
+        article.author = data.get("author", "")
+        article.scraped_at = data.get("scrapedAt") or cls.run_timestamp()
+        article.published_at = data.get("publishedAt") or article.scraped_at
+        article.image_url = data.get("imageUrl", "")
+        article.image_sources = dict(data.get("imageSources") or {})
+        article.tags = _intern_tags(data.get("tags"))
+        article.category = sys.intern(data.get("category", "news"))
+        article.priority = data.get("priority", 1)
+        article.related_sources = list(data.get("relatedSources", []))
+        return article
+
     def to_dict(self) -> Dict:
         return {
             "id": self.id,
@@ -54,470 +167,2603 @@ class NewsArticle:
             "publishedAt": self.published_at,
             "scrapedAt": self.scraped_at,
             "imageUrl": self.image_url,
+            "imageSources": self.image_sources,
             "tags": self.tags,
             "category": self.category,
-            "priority": self.priority
+            "priority": self.priority,
+            "relatedSources": self.related_sources
         }
 
-class NewsScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self.articles = []
+class MinHashLSH:
+    """MinHash signatures bucketed by LSH bands.
+
+    Documents sharing any band bucket become candidate pairs, so finding
+    near-duplicates costs roughly O(n) instead of comparing every pair.
+    """
+
+    def __init__(self, num_perm: int = 24, bands: int = 8, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = random.Random(seed)
+        self.rows = num_perm // bands
+        self.bands = bands
+        # XOR with a random mask stands in for a random permutation of the
+        # 32-bit shingle hashes; much cheaper than multiply-mod in pure Python
+        self._masks = [rng.getrandbits(32) for _ in range(num_perm)]
+        self._buckets: Dict[Tuple, List[int]] = {}
+
+    def signature(self, shingles: Set[str]) -> List[int]:
+        hashes = [zlib.crc32(shingle.encode()) for shingle in shingles] or [0]
+        return [min([h ^ mask for h in hashes]) for mask in self._masks]
+
+    def insert(self, key: int, shingles: Set[str]) -> Set[int]:
+        """Add a document and return the keys of previously added candidates"""
+        signature = self.signature(shingles)
+        candidates = set()
+        for band in range(self.bands):
+            bucket = (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            members = self._buckets.setdefault(bucket, [])
+            candidates.update(members)
+            members.append(key)
+        return candidates
+
+def _shingles(text: str, size: int = 4) -> Set[str]:
+    """Character shingles of a normalized title"""
+    normalized = " ".join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
 
-    def scrape_aljazeera_gaza(self) -> List[NewsArticle]:
-        """Scrape Al Jazeera Gaza section"""
+def cluster_near_duplicates(articles: List[NewsArticle], threshold: float = 0.7) -> List[NewsArticle]:
+    """Collapse near-duplicate stories from different sources into one representative each.
+
+    Candidates come from a MinHash LSH index over title shingles and are
+    confirmed with an exact Jaccard check. A cluster never holds two
+    articles from the same source, since those are separate stories (e.g.
+    a live blog's daily editions). Each cluster keeps its highest-priority
+    article, the newest on ties, which lists the others in `related_sources`.
+    """
+    index = MinHashLSH()
+    shingles = [_shingles(article.title) for article in articles]
+    parent = list(range(len(articles)))
+    sources = [{article.source} for article in articles]
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(articles)):
+        scored = [(_jaccard(shingles[i], shingles[j]), j) for j in index.insert(i, shingles[i])]
+        # Closest matches first, so a story joins its own edition rather
+        # than an earlier one from the same source
+        for score, j in sorted(scored, reverse=True):
+            if score < threshold:
+                break
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j and not sources[root_i] & sources[root_j]:
+                parent[root_i] = root_j
+                sources[root_j] |= sources[root_i]
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(articles)):
+        clusters.setdefault(find(i), []).append(i)
+
+    representatives = []
+    for members in sorted(clusters.values()):
+        best = max(members, key=lambda i: (articles[i].priority, _parse_timestamp(articles[i].published_at), -i))
+        representative = articles[best]
+        for i in members:
+            if i != best:
+                representative.add_related(articles[i])
+        representatives.append(representative)
+
+    if len(representatives) < len(articles):
+        logger.info(f"Collapsed {len(articles) - len(representatives)} near-duplicate articles")
+    return representatives
+
+# Responses worth another attempt after a backoff
+RETRYABLE_STATUS = frozenset((429, 500, 502, 503, 504))
+
+class RunDeadlineExceeded(Exception):
+    """The run's time budget ran out before a source finished"""
+
+class CircuitBreaker:
+    """Skip sources that keep failing for a cool-down period, across runs.
+
+    After `failure_threshold` consecutive failed runs a source's circuit
+    opens for `cooldown` seconds, doubling with each further failure up to
+    `max_cooldown`. When the cool-down has passed one run is let through:
+    success closes the circuit, another failure reopens it.
+    """
+
+    def __init__(self, state_path: str = ".cache/circuit-breaker.json", failure_threshold: int = 3,
+                 cooldown: float = 1800, max_cooldown: float = 6 * 3600):
+        self.state_path = state_path
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = {}
         try:
-            url = "https://www.aljazeera.com/where/gaza/"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = []
-            # Look for article containers
-            article_containers = soup.find_all(['article', 'div'], class_=re.compile(r'article|post|story'))
-            
-            for container in article_containers[:10]:  # Limit to 10 articles
-                try:
-                    title_elem = container.find(['h1', 'h2', 'h3', 'h4'], class_=re.compile(r'title|headline'))
-                    if not title_elem:
-                        continue
-                    
-                    title = title_elem.get_text(strip=True)
-                    if len(title) < 10:  # Skip very short titles
-                        continue
-                    
-                    # Get article URL
-                    link_elem = title_elem.find('a') or container.find('a')
-                    if link_elem:
-                        article_url = urljoin(url, link_elem.get('href', ''))
-                    else:
-                        continue
-                    
-                    # Get summary
-                    summary_elem = container.find(['p', 'div'], class_=re.compile(r'summary|excerpt|description'))
-                    summary = summary_elem.get_text(strip=True) if summary_elem else title
-                    
-                    # Get image
-                    img_elem = container.find('img')
-                    image_url = ""
-                    if img_elem:
-                        img_src = img_elem.get('src') or img_elem.get('data-src')
-                        if img_src:
-                            image_url = urljoin(url, img_src)
-                    
-                    article = NewsArticle(
-                        title=title,
-                        summary=summary,
-                        url=article_url,
-                        source="Al Jazeera",
-                        image_url=image_url,
-                        tags=["Gaza", "Palestine", "Middle East"],
-                        category="News",
-                        priority=4
-                    )
-                    articles.append(article)
-                    
-                except Exception as e:
-                    logger.warning(f"Error parsing Al Jazeera article: {e}")
-                    continue
-            
-            logger.info(f"Scraped {len(articles)} articles from Al Jazeera")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"Error scraping Al Jazeera: {e}")
-            return []
+            with open(state_path, 'r', encoding='utf-8') as f:
+                self._state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def allow(self, key: str) -> bool:
+        with self._lock:
+            return time.time() >= self._state.get(key, {}).get("openUntil", 0)
+
+    def record_success(self, key: str):
+        with self._lock:
+            if self._state.pop(key, None) is not None:
+                self._save()
+
+    def record_failure(self, key: str):
+        with self._lock:
+            entry = self._state.setdefault(key, {"failures": 0})
+            entry["failures"] += 1
+            if entry["failures"] >= self.failure_threshold:
+                cooldown = min(self.cooldown * 2 ** (entry["failures"] - self.failure_threshold), self.max_cooldown)
+                entry["openUntil"] = time.time() + cooldown
+                logger.warning(f"Circuit open for {key} after {entry['failures']} failed runs, "
+                               f"retrying in {cooldown / 60:.0f} min")
+            self._save()
+
+    def _save(self):
+        # Saved on every change (under the lock), so sources finishing after
+        # the run deadline are not lost
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        _atomic_write_bytes(self.state_path, json.dumps(self._state, indent=2).encode('utf-8'))
+
+class HostRateLimiter:
+    """Enforce a minimum interval between requests to the same host"""
+
+    def __init__(self, min_interval: float = 2.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def wait(self, url: str, deadline: Optional[float] = None):
+        """Block until the host of `url` may be contacted again"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            if deadline is not None and slot >= deadline:
+                raise RunDeadlineExceeded(f"no request slot for {host} before the run deadline")
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class HTTPCache:
+    """On-disk cache of source page validators and the articles extracted from them"""
 
-    def scrape_middle_east_eye(self) -> List[NewsArticle]:
-        """Scrape Middle East Eye"""
+    def __init__(self, cache_dir: str = ".cache/http", max_entries: int = 200,
+                 max_bytes: int = 20 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Return the cached entry for a URL, if any"""
         try:
-            url = "https://www.middleeasteye.net/"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = []
-            # Look for article links
-            article_links = soup.find_all('a', href=re.compile(r'/news/|/opinion/|/analysis/'))
-            
-            seen_urls = set()
-            for link in article_links[:15]:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from a cached entry"""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("lastModified"):
+                headers["If-Modified-Since"] = entry["lastModified"]
+        return headers
+
+    def store(self, url: str, response: requests.Response, body_hash: str, articles: List[NewsArticle],
+              extractor: str = ""):
+        """Save validators and extracted articles for a URL, tagged with the extractor that produced them"""
+        entry = {
+            "url": url,
+            "extractor": extractor,
+            "etag": response.headers.get("ETag", ""),
+            "lastModified": response.headers.get("Last-Modified", ""),
+            "bodyHash": body_hash,
+            "articles": [article.to_dict() for article in articles]
+        }
+        self._write(url, entry)
+
+    def refresh(self, url: str, entry: Dict, response: requests.Response):
+        """Keep an entry alive, picking up any new validators from the response"""
+        entry["etag"] = response.headers.get("ETag", entry.get("etag", ""))
+        entry["lastModified"] = response.headers.get("Last-Modified", entry.get("lastModified", ""))
+        self._write(url, entry)
+
+    def _write(self, url: str, entry: Dict):
+        _atomic_write_bytes(self._path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently written entries until the cache fits its bounds"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self.cache_dir, name)
                 try:
-                    article_url = urljoin(url, link.get('href'))
-                    if article_url in seen_urls:
-                        continue
-                    seen_urls.add(article_url)
-                    
-                    title = link.get_text(strip=True)
-                    if len(title) < 10:
-                        continue
-                    
-                    # Try to get more details from the link's parent container
-                    container = link.find_parent(['article', 'div'])
-                    summary = title  # Default to title
-                    image_url = ""
-                    
-                    if container:
-                        # Look for summary
-                        summary_elem = container.find(['p', 'div'], class_=re.compile(r'summary|excerpt|description'))
-                        if summary_elem:
-                            summary = summary_elem.get_text(strip=True)
-                        
-                        # Look for image
-                        img_elem = container.find('img')
-                        if img_elem:
-                            img_src = img_elem.get('src') or img_elem.get('data-src')
-                            if img_src:
-                                image_url = urljoin(url, img_src)
-                    
-                    article = NewsArticle(
-                        title=title,
-                        summary=summary,
-                        url=article_url,
-                        source="Middle East Eye",
-                        image_url=image_url,
-                        tags=["Palestine", "Middle East", "Analysis"],
-                        category="News",
-                        priority=3
-                    )
-                    articles.append(article)
-                    
-                except Exception as e:
-                    logger.warning(f"Error parsing Middle East Eye article: {e}")
+                    stat = os.stat(path)
+                except OSError:
                     continue
-            
-            logger.info(f"Scraped {len(articles)} articles from Middle East Eye")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"Error scraping Middle East Eye: {e}")
-            return []
+                entries.append((stat.st_mtime, stat.st_size, path))
 
-    def scrape_972_magazine(self) -> List[NewsArticle]:
-        """Scrape +972 Magazine"""
-        try:
-            url = "https://www.972mag.com/"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = []
-            # Look for article containers
-            article_containers = soup.find_all(['article', 'div'], class_=re.compile(r'post|article|story'))
-            
-            for container in article_containers[:10]:
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+                _, size, path = entries.pop(0)
+                total -= size
                 try:
-                    title_elem = container.find(['h1', 'h2', 'h3'], class_=re.compile(r'title|headline'))
-                    if not title_elem:
-                        continue
-                    
-                    title = title_elem.get_text(strip=True)
-                    if len(title) < 10:
-                        continue
-                    
-                    # Get article URL
-                    link_elem = title_elem.find('a') or container.find('a')
-                    if link_elem:
-                        article_url = urljoin(url, link_elem.get('href', ''))
-                    else:
-                        continue
-                    
-                    # Get summary
-                    summary_elem = container.find(['p', 'div'], class_=re.compile(r'excerpt|summary'))
-                    summary = summary_elem.get_text(strip=True) if summary_elem else title
-                    
-                    # Get image
-                    img_elem = container.find('img')
-                    image_url = ""
-                    if img_elem:
-                        img_src = img_elem.get('src') or img_elem.get('data-src')
-                        if img_src:
-                            image_url = urljoin(url, img_src)
-                    
-                    article = NewsArticle(
-                        title=title,
-                        summary=summary,
-                        url=article_url,
-                        source="+972 Magazine",
-                        image_url=image_url,
-                        tags=["Palestine", "Israel", "Human Rights"],
-                        category="Analysis",
-                        priority=3
-                    )
-                    articles.append(article)
-                    
-                except Exception as e:
-                    logger.warning(f"Error parsing +972 Magazine article: {e}")
-                    continue
-            
-            logger.info(f"Scraped {len(articles)} articles from +972 Magazine")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"Error scraping +972 Magazine: {e}")
-            return []
+                    os.remove(path)
+                except OSError:
+                    pass
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+# Bump whenever a change to the extraction code changes the articles it returns
+EXTRACTOR_VERSION = 1
+
+def _class_filter(pattern: Optional[re.Pattern]) -> Dict:
+    """Keyword arguments for find()/find_all(); class_=None would only match elements without a class"""
+    return {"class_": pattern} if pattern else {}
+
+class SourceConfig:
+    """Declarative description of how to scrape one news source.
+
+    Two extraction modes are supported:
 
-    def scrape_electronic_intifada(self) -> List[NewsArticle]:
-        """Scrape The Electronic Intifada"""
+    - ``containers``: find article containers by tag/class, then look for a
+      title, link, summary and image inside each one.
+    - ``links``: find article links by ``href`` pattern and use the link text
+      as the title, optionally looking at the link's parent container for a
+      summary and image (``use_context``).
+    """
+
+    def __init__(self, key: str, name: str, url: str, tags: List[str], category: str = "News",
+                 priority: int = 3, mode: str = "containers", limit: int = 10,
+                 container_tags: List[str] = None, container_class: str = "",
+                 title_tags: List[str] = None, title_class: str = "",
+                 summary_tags: List[str] = None, summary_class: str = "",
+                 link_pattern: str = "", use_context: bool = False, extract_images: bool = True,
+                 feed_url: str = ""):
+        self.key = key
+        self.name = name
+        self.url = url
+        self.feed_url = feed_url
+        self.tags = tags
+        self.category = category
+        self.priority = priority
+        self.mode = mode
+        self.limit = limit
+        self.container_tags = container_tags or ['article', 'div']
+        self.title_tags = title_tags or ['h1', 'h2', 'h3', 'h4']
+        self.summary_tags = summary_tags or ['p', 'div']
+        self.use_context = use_context
+        self.extract_images = extract_images
+
+        # Compile every pattern once instead of on each page or container
+        self.container_class = re.compile(container_class) if container_class else None
+        self.title_class = re.compile(title_class) if title_class else None
+        self.summary_class = re.compile(summary_class) if summary_class else None
+        self.link_pattern = re.compile(link_pattern) if link_pattern else None
+        self.strainer = self._build_strainer()
+
+    def extractor_fingerprint(self, parser: str) -> str:
+        """Identify what this config, the parser and the extraction code produce.
+
+        Cached articles are only reused while this matches, so editing a
+        selector, switching parsers or bumping EXTRACTOR_VERSION re-extracts
+        unchanged pages.
+        """
+        fields = {name: value.pattern if isinstance(value, re.Pattern) else value
+                  for name, value in vars(self).items() if name != "strainer"}
+        fields.update(parser=parser, version=EXTRACTOR_VERSION)
+        return hashlib.sha1(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _build_strainer(self) -> Optional[SoupStrainer]:
+        """Restrict parsing to the subtrees the extractor actually reads"""
+        if self.mode == "containers":
+            return SoupStrainer(self.container_tags, **_class_filter(self.container_class))
+        if self.use_context:
+            # Summaries and images come from the link's ancestors, so the
+            # whole document is needed
+            return None
+        return SoupStrainer('a', href=self.link_pattern)
+
+SOURCES = [
+    SourceConfig(
+        key="aljazeera", name="Al Jazeera", url="https://www.aljazeera.com/where/gaza/",
+        tags=["Gaza", "Palestine", "Middle East"], priority=4,
+        container_class=r'article|post|story', title_class=r'title|headline',
+        summary_class=r'summary|excerpt|description'
+    ),
+    SourceConfig(
+        key="middle_east_eye", name="Middle East Eye", url="https://www.middleeasteye.net/",
+        tags=["Palestine", "Middle East", "Analysis"], mode="links", limit=15,
+        link_pattern=r'/news/|/opinion/|/analysis/', use_context=True,
+        summary_class=r'summary|excerpt|description',
+        feed_url="https://www.middleeasteye.net/rss"
+    ),
+    SourceConfig(
+        key="972mag", name="+972 Magazine", url="https://www.972mag.com/",
+        tags=["Palestine", "Israel", "Human Rights"], category="Analysis",
+        container_class=r'post|article|story', title_tags=['h1', 'h2', 'h3'],
+        title_class=r'title|headline', summary_class=r'excerpt|summary',
+        feed_url="https://www.972mag.com/feed/"
+    ),
+    SourceConfig(
+        key="electronic_intifada", name="The Electronic Intifada", url="https://electronicintifada.net/",
+        tags=["Palestine", "Human Rights", "Activism"], mode="links", link_pattern=r'/content/',
+        feed_url="https://electronicintifada.net/rss.xml"
+    ),
+    SourceConfig(
+        key="imemc", name="IMEMC News", url="https://imemc.org/",
+        tags=["Palestine", "West Bank", "Gaza"], container_class=r'post|article|news',
+        summary_tags=['p'], extract_images=False,
+        feed_url="https://imemc.org/feed/"
+    ),
+    SourceConfig(
+        key="palestine_chronicle", name="The Palestine Chronicle", url="https://www.palestinechronicle.com/",
+        tags=["Palestine", "Politics", "Culture"], priority=2, mode="links", link_pattern=r'/\d{4}/',
+        feed_url="https://www.palestinechronicle.com/feed/"
+    ),
+    SourceConfig(
+        key="wafa", name="WAFA", url="https://english.wafa.ps/",
+        tags=["Palestine", "Official", "Government"], mode="links", link_pattern=r'/Pages/'
+    ),
+]
+
+SOURCES_BY_KEY = {source.key: source for source in SOURCES}
+
+def _image_url(container, base_url: str) -> str:
+    img_elem = container.find('img')
+    if img_elem:
+        img_src = img_elem.get('src') or img_elem.get('data-src')
+        if img_src:
+            return urljoin(base_url, img_src)
+    return ""
+
+def _count(stats: Optional[Dict[str, int]], key: str):
+    if stats is not None:
+        stats[key] = stats.get(key, 0) + 1
+
+def _extract_from_containers(source: SourceConfig, soup: BeautifulSoup, url: str,
+                             stats: Optional[Dict[str, int]] = None) -> List[NewsArticle]:
+    articles = []
+    article_containers = soup.find_all(source.container_tags, **_class_filter(source.container_class))
+
+    for container in article_containers[:source.limit]:
+        _count(stats, "candidates")
         try:
-            url = "https://electronicintifada.net/"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = []
-            # Look for article links
-            article_links = soup.find_all('a', href=re.compile(r'/content/'))
-            
-            seen_urls = set()
-            for link in article_links[:10]:
-                try:
-                    article_url = urljoin(url, link.get('href'))
-                    if article_url in seen_urls:
-                        continue
-                    seen_urls.add(article_url)
-                    
-                    title = link.get_text(strip=True)
-                    if len(title) < 10:
-                        continue
-                    
-                    article = NewsArticle(
-                        title=title,
-                        summary=title,  # Use title as summary for now
-                        url=article_url,
-                        source="The Electronic Intifada",
-                        tags=["Palestine", "Human Rights", "Activism"],
-                        category="News",
-                        priority=3
-                    )
-                    articles.append(article)
-                    
-                except Exception as e:
-                    logger.warning(f"Error parsing Electronic Intifada article: {e}")
-                    continue
-            
-            logger.info(f"Scraped {len(articles)} articles from Electronic Intifada")
-            return articles
-            
+            title_elem = container.find(source.title_tags, **_class_filter(source.title_class))
+            if not title_elem:
+                continue
+
+            title = title_elem.get_text(strip=True)
+            if len(title) < 10:  # Skip very short titles
+                _count(stats, "rejected_short_title")
+                continue
+
+            link_elem = title_elem.find('a') or container.find('a')
+            if not link_elem:
+                continue
+            article_url = urljoin(url, link_elem.get('href', ''))
+
+            summary_elem = container.find(source.summary_tags, **_class_filter(source.summary_class))
+            summary = summary_elem.get_text(strip=True) if summary_elem else title
+
+            articles.append(NewsArticle(
+                title=title,
+                summary=summary,
+                url=article_url,
+                source=source.name,
+                image_url=_image_url(container, url) if source.extract_images else "",
+                tags=list(source.tags),
+                category=source.category,
+                priority=source.priority
+            ))
+
         except Exception as e:
-            logger.error(f"Error scraping Electronic Intifada: {e}")
-            return []
+            _count(stats, "errors")
+            logger.warning(f"Error parsing {source.name} article: {e}")
+            continue
+
+    return articles
 
-    def scrape_imemc(self) -> List[NewsArticle]:
-        """Scrape IMEMC News"""
+def _extract_from_links(source: SourceConfig, soup: BeautifulSoup, url: str,
+                        stats: Optional[Dict[str, int]] = None) -> List[NewsArticle]:
+    articles = []
+    article_links = soup.find_all('a', href=source.link_pattern)
+
+    seen_urls = set()
+    for link in article_links[:source.limit]:
+        _count(stats, "candidates")
         try:
-            url = "https://imemc.org/"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = []
-            # Look for article containers
-            article_containers = soup.find_all(['article', 'div'], class_=re.compile(r'post|article|news'))
-            
-            for container in article_containers[:10]:
-                try:
-                    title_elem = container.find(['h1', 'h2', 'h3', 'h4'])
-                    if not title_elem:
-                        continue
-                    
-                    title = title_elem.get_text(strip=True)
-                    if len(title) < 10:
-                        continue
-                    
-                    # Get article URL
-                    link_elem = title_elem.find('a') or container.find('a')
-                    if link_elem:
-                        article_url = urljoin(url, link_elem.get('href', ''))
-                    else:
-                        continue
-                    
-                    # Get summary
-                    summary_elem = container.find('p')
-                    summary = summary_elem.get_text(strip=True) if summary_elem else title
-                    
-                    article = NewsArticle(
-                        title=title,
-                        summary=summary,
-                        url=article_url,
-                        source="IMEMC News",
-                        tags=["Palestine", "West Bank", "Gaza"],
-                        category="News",
-                        priority=3
-                    )
-                    articles.append(article)
-                    
-                except Exception as e:
-                    logger.warning(f"Error parsing IMEMC article: {e}")
-                    continue
-            
-            logger.info(f"Scraped {len(articles)} articles from IMEMC")
-            return articles
-            
+            article_url = urljoin(url, link.get('href'))
+            if article_url in seen_urls:
+                continue
+            seen_urls.add(article_url)
+
+            title = link.get_text(strip=True)
+            if len(title) < 10:
+                _count(stats, "rejected_short_title")
+                continue
+
+            summary = title  # Default to title
+            image_url = ""
+            if source.use_context:
+                container = link.find_parent(['article', 'div'])
+                if container:
+                    summary_elem = container.find(source.summary_tags, **_class_filter(source.summary_class))
+                    if summary_elem:
+                        summary = summary_elem.get_text(strip=True)
+                    if source.extract_images:
+                        image_url = _image_url(container, url)
+
+            articles.append(NewsArticle(
+                title=title,
+                summary=summary,
+                url=article_url,
+                source=source.name,
+                image_url=image_url,
+                tags=list(source.tags),
+                category=source.category,
+                priority=source.priority
+            ))
+
         except Exception as e:
-            logger.error(f"Error scraping IMEMC: {e}")
-            return []
+            _count(stats, "errors")
+            logger.warning(f"Error parsing {source.name} article: {e}")
+            continue
+
+    return articles
+
+def extract_articles(source: SourceConfig, content: bytes, parser: str = DEFAULT_PARSER,
+                     stats: Optional[Dict[str, int]] = None) -> List[NewsArticle]:
+    """Parse a source page and extract its articles according to the source config.
+
+    If `stats` is given, candidate, rejection and error counts are added to it.
+    """
+    soup = BeautifulSoup(content, parser, parse_only=source.strainer)
+    if source.mode == "links":
+        return _extract_from_links(source, soup, source.url, stats)
+    return _extract_from_containers(source, soup, source.url, stats)
+
+class CandidateScanner(HTMLParser):
+    """Incrementally find where a page's extraction candidates end.
+
+    Mirrors the extractor's selection: the first `limit` containers, or
+    article links, in document order. `done` becomes true once that many
+    have been seen and closed (for links read with `use_context`, once
+    their enclosing container closed), so the rest of the page can be
+    skipped and the extractor run on the prefix alone.
+    """
+
+    VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+                           "param", "source", "track", "wbr"))
+
+    def __init__(self, source: SourceConfig):
+        super().__init__(convert_charrefs=False)
+        self.source = source
+        self.candidates = 0
+        self.done = False
+        self._open: List[str] = []
+        # Depths of the elements that must close before the prefix is usable
+        self._pending: List[int] = []
+
+    def _is_candidate(self, tag: str, attrs) -> bool:
+        if self.source.mode == "links":
+            if tag != 'a':
+                return False
+            href = dict(attrs).get('href')
+            return href is not None and (self.source.link_pattern is None or bool(self.source.link_pattern.search(href)))
+        if tag not in self.source.container_tags:
+            return False
+        return self.source.container_class is None or bool(self.source.container_class.search(dict(attrs).get('class') or ""))
+
+    def handle_starttag(self, tag: str, attrs):
+        if self.done or tag in self.VOID_TAGS:
+            return
+        depth = len(self._open)
+        self._open.append(tag)
+        if self.candidates >= self.source.limit or not self._is_candidate(tag, attrs):
+            return
+        self.candidates += 1
+        if self.source.mode == "links" and self.source.use_context:
+            for parent_depth in range(depth - 1, -1, -1):
+                if self._open[parent_depth] in ('article', 'div'):
+                    depth = parent_depth
+                    break
+        self._pending.append(depth)
+
+    def handle_endtag(self, tag: str):
+        if self.done or tag not in self._open:
+            return
+        # Closing an element also closes anything left open inside it
+        del self._open[len(self._open) - 1 - self._open[::-1].index(tag):]
+        self._pending = [depth for depth in self._pending if depth < len(self._open)]
+        self.done = self.candidates >= self.source.limit and not self._pending
+
+def _feed_image(entry) -> str:
+    for media in entry.get("media_content", []) + entry.get("media_thumbnail", []):
+        if media.get("url"):
+            return media["url"]
+    for enclosure in entry.get("enclosures", []):
+        if enclosure.get("type", "").startswith("image/") and enclosure.get("href"):
+            return enclosure["href"]
+    return ""
+
+def extract_feed_articles(source: SourceConfig, content: bytes,
+                          stats: Optional[Dict[str, int]] = None) -> List[NewsArticle]:
+    """Build articles from a source's RSS/Atom feed.
+
+    Raises ValueError when the feed is unusable so callers can fall back
+    to the HTML extractor.
+    """
+    feed = feedparser.parse(content)
+    if not feed.entries:
+        raise ValueError(f"no entries in feed ({feed.get('bozo_exception', 'empty feed')})")
+
+    articles = []
+    for entry in feed.entries[:source.limit]:
+        _count(stats, "candidates")
+        title = BeautifulSoup(entry.get("title", ""), 'html.parser').get_text(strip=True)
+        link = entry.get("link", "")
+        if len(title) < 10:
+            _count(stats, "rejected_short_title")
+            continue
+        if not link:
+            continue
+
+        summary = BeautifulSoup(entry.get("summary", ""), 'html.parser').get_text(" ", strip=True)
+        published = entry.get("published_parsed") or entry.get("updated_parsed")
+        articles.append(NewsArticle(
+            title=title,
+            summary=summary or title,
+            url=urljoin(source.feed_url, link),
+            source=source.name,
+            author=entry.get("author", ""),
+            published_at=datetime(*published[:6], tzinfo=timezone.utc).isoformat() if published else "",
+            image_url=_feed_image(entry),
+            tags=list(source.tags),
+            category=source.category,
+            priority=source.priority
+        ))
+    return articles
+
+def parse_source_page(source: SourceConfig, content: bytes, parser: str = DEFAULT_PARSER,
+                      run_timestamp: Optional[str] = None) -> Tuple[List[Dict], Dict[str, int]]:
+    """Process pool entry point: parse a page and return plain article dicts and extraction stats"""
+    # Worker processes outlive a run, so they take the parent's run timestamp
+    NewsArticle.start_run(run_timestamp)
+    stats: Dict[str, int] = {}
+    articles = extract_articles(source, content, parser, stats)
+    return [article.to_dict() for article in articles], stats
+
+_connect_timing = threading.local()
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        _connect_timing.seconds = getattr(_connect_timing, "seconds", 0.0) + time.perf_counter() - started
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        # Includes the TLS handshake
+        started = time.perf_counter()
+        super().connect()
+        _connect_timing.seconds = getattr(_connect_timing, "seconds", 0.0) + time.perf_counter() - started
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record how long connecting took"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool
+        }
+
+class SourceMetrics:
+    """Timings and counters collected while scraping one source during a run"""
+
+    COUNTERS = ("requests", "retries", "bytes", "early_stops", "truncated_pages", "cache_hits", "candidates",
+                "kept", "rejected_short_title", "errors")
+    TIMINGS = ("wait_s", "connect_s", "ttfb_s", "download_s", "parse_s", "total_s")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.mode = ""
+        self.timed_out = False
+        self.status_codes: List[int] = []
+        self.error_messages: List[str] = []
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        for name in self.TIMINGS:
+            setattr(self, name, 0.0)
+
+    def add_stats(self, stats: Dict[str, int]):
+        """Add extraction counters (candidates, rejections, errors)"""
+        for name, value in stats.items():
+            if name in self.COUNTERS:
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_error(self, error: Exception):
+        self.errors += 1
+        self.error_messages.append(f"{type(error).__name__}: {error}")
+
+    def record_deadline(self, error: RunDeadlineExceeded):
+        """Record the run deadline as an error once, whichever thread notices it first"""
+        if not self.timed_out:
+            self.timed_out = True
+            self.record_error(error)
+
+    def to_dict(self) -> Dict:
+        data = {"source": self.source, "mode": self.mode, "statusCodes": self.status_codes,
+                "errorMessages": self.error_messages}
+        data.update({name: getattr(self, name) for name in self.COUNTERS})
+        data.update({name: round(getattr(self, name), 4) for name in self.TIMINGS})
+        return data
+
+def write_run_report(metrics: List[SourceMetrics], filename: str, started_at: str, duration: float,
+                     total_articles: int):
+    """Write a JSON report describing one scrape run"""
+    report = {
+        "startedAt": started_at,
+        "durationSeconds": round(duration, 4),
+        "totalArticles": total_articles,
+        "sources": [source_metrics.to_dict() for source_metrics in metrics]
+    }
+    _atomic_write_bytes(filename, json.dumps(report, indent=2, ensure_ascii=False).encode('utf-8'))
+
+def write_prometheus_textfile(metrics: List[SourceMetrics], filename: str, duration: float, total_articles: int):
+    """Write run metrics in the node_exporter textfile collector format"""
+    lines = [
+        "# HELP scraper_run_duration_seconds Wall-clock duration of the last scrape run.",
+        "# TYPE scraper_run_duration_seconds gauge",
+        f"scraper_run_duration_seconds {duration:.6f}",
+        "# HELP scraper_run_articles Articles produced by the last scrape run.",
+        "# TYPE scraper_run_articles gauge",
+        f"scraper_run_articles {total_articles}",
+        "# HELP scraper_run_timestamp_seconds Unix time the last scrape run finished.",
+        "# TYPE scraper_run_timestamp_seconds gauge",
+        f"scraper_run_timestamp_seconds {time.time():.0f}",
+    ]
+    for name in SourceMetrics.TIMINGS + SourceMetrics.COUNTERS:
+        timing = name.endswith("_s")
+        suffix = f"{name[:-2]}_seconds" if timing else name
+        metric = f"scraper_source_{suffix}"
+        lines.append(f"# HELP {metric} Per-source {suffix.replace('_', ' ')} in the last scrape run.")
+        lines.append(f"# TYPE {metric} gauge")
+        for source_metrics in metrics:
+            value = getattr(source_metrics, name)
+            lines.append(f'{metric}{{source="{source_metrics.source}"}} {value:.6f}' if timing
+                         else f'{metric}{{source="{source_metrics.source}"}} {value}')
+
+    _atomic_write_bytes(filename, ("\n".join(lines) + "\n").encode('utf-8'))
+
+class NewsScraper:
+    # Bytes read at a time when scanning a source page for early stop
+    page_chunk_size = 16384
+
+    def __init__(self, max_workers: int = 8, host_interval: float = 2.0, connect_timeout: float = 5,
+                 read_timeout: float = 10, http_cache: Optional[HTTPCache] = None,
+                 sources: Optional[List[SourceConfig]] = None, parser: str = DEFAULT_PARSER,
+                 parse_workers: int = 0, near_duplicate_threshold: float = 0.7, use_feeds: bool = True,
+                 retries: int = 2, backoff: float = 0.5, max_backoff: float = 10,
+                 circuit_breaker: Optional[CircuitBreaker] = None, time_budget: Optional[float] = None,
+                 early_stop: bool = True, max_page_bytes: int = 2 * 1024 * 1024):
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.use_feeds = use_feeds
+        self.sources = sources if sources is not None else SOURCES
+        self.parser = parser
+        self.parse_workers = parse_workers
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._parse_pool_lock = threading.Lock()
+        self.max_workers = max(1, max_workers)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.circuit_breaker = circuit_breaker
+        self.time_budget = time_budget
+        self.early_stop = early_stop
+        self.max_page_bytes = max_page_bytes
+        # Deadline of the scrape run the current worker thread belongs to
+        self._run_deadline = threading.local()
+        # Deadline of the latest scrape run, shared by follow-up fetches such as enrichment
+        self.deadline: Optional[float] = None
+        self.http_cache = http_cache
+        self.rate_limiter = HostRateLimiter(host_interval)
+        self.session = self._build_session()
+        self.articles = []
+        self.metrics: Dict[str, SourceMetrics] = {}
 
-    def scrape_palestine_chronicle(self) -> List[NewsArticle]:
-        """Scrape The Palestine Chronicle"""
+    def _build_session(self) -> requests.Session:
+        """Create a session whose connection pool can serve every worker thread"""
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+        adapter = InstrumentedHTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @contextmanager
+    def run_deadline(self, deadline: Optional[float]):
+        """Cap the current thread's fetches to `deadline` (a time.monotonic() value)"""
+        self._run_deadline.value = deadline
         try:
-            url = "https://www.palestinechronicle.com/"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = []
-            # Look for article links
-            article_links = soup.find_all('a', href=re.compile(r'/\d{4}/'))
-            
-            seen_urls = set()
-            for link in article_links[:10]:
-                try:
-                    article_url = urljoin(url, link.get('href'))
-                    if article_url in seen_urls:
-                        continue
-                    seen_urls.add(article_url)
-                    
-                    title = link.get_text(strip=True)
-                    if len(title) < 10:
-                        continue
-                    
-                    article = NewsArticle(
-                        title=title,
-                        summary=title,
-                        url=article_url,
-                        source="The Palestine Chronicle",
-                        tags=["Palestine", "Politics", "Culture"],
-                        category="News",
-                        priority=2
-                    )
-                    articles.append(article)
-                    
-                except Exception as e:
-                    logger.warning(f"Error parsing Palestine Chronicle article: {e}")
-                    continue
-            
-            logger.info(f"Scraped {len(articles)} articles from Palestine Chronicle")
-            return articles
-            
-        except Exception as e:
-            logger.error(f"Error scraping Palestine Chronicle: {e}")
-            return []
+            yield
+        finally:
+            self._run_deadline.value = None
+
+    def _timeouts(self, deadline: Optional[float]) -> Tuple[float, float]:
+        """(connect, read) timeouts, shortened to fit the run deadline"""
+        if deadline is None:
+            return self.connect_timeout, self.read_timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RunDeadlineExceeded("run deadline reached")
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+    def _backoff(self, attempt: int, url: str, reason, deadline: Optional[float],
+                 retry_after: Optional[str] = None) -> bool:
+        """Sleep a jittered exponential delay before a retry; False if the deadline leaves no time"""
+        delay = random.uniform(0, self.backoff * 2 ** attempt)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        delay = min(delay, self.max_backoff)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+        logger.info(f"Retrying {url} in {delay:.1f}s ({reason})")
+        time.sleep(delay)
+        return True
+
+    def _read_page(self, response: requests.Response, source: SourceConfig,
+                   deadline: Optional[float], metrics: Optional[SourceMetrics] = None) -> bytes:
+        """Read a source page in chunks, stopping once its candidates are complete or at the byte cap.
+
+        The body is fed to a CandidateScanner as it arrives; when the
+        scanner is done the connection is dropped and the prefix becomes
+        the response content. With early stop disabled the whole page is
+        read and the byte cap does not apply either.
+        """
+        scanner = CandidateScanner(source) if self.early_stop else None
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=self.page_chunk_size):
+            chunks.append(chunk)
+            size += len(chunk)
+            if scanner is not None:
+                # latin-1 keeps offsets byte-aligned; tags and attributes are ASCII
+                scanner.feed(chunk.decode('latin-1'))
+                if scanner.done:
+                    response.close()
+                    if metrics is not None:
+                        metrics.early_stops += 1
+                    break
+                if size >= self.max_page_bytes:
+                    response.close()
+                    if metrics is not None:
+                        metrics.truncated_pages += 1
+                    logger.info(f"{source.name} page cut at the {self.max_page_bytes} byte cap")
+                    break
+            if deadline is not None and time.monotonic() >= deadline:
+                raise RunDeadlineExceeded(f"download of {response.url} ran past the run deadline")
+        response._content = b"".join(chunks)
+        response._content_consumed = True
+        return response._content
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None,
+              metrics: Optional[SourceMetrics] = None, page_of: Optional[SourceConfig] = None) -> requests.Response:
+        """GET a URL, respecting the per-host politeness interval.
+
+        Connection errors, timeouts and retryable statuses are retried up
+        to `retries` times with jittered exponential backoff, all within
+        the deadline of the current scrape run. With `page_of`, the URL is
+        that source's HTML page and only as much of it is downloaded as the
+        extractor needs (see _read_page). With `metrics`, the politeness
+        wait, connect time, time to first byte, download time and body
+        size are recorded.
+        """
+        deadline = getattr(self._run_deadline, "value", None)
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            self.rate_limiter.wait(url, deadline)
+            requested = time.perf_counter()
+            _connect_timing.seconds = 0.0
+            timeouts = self._timeouts(deadline)
+            try:
+                response = self.session.get(url, headers=headers, timeout=timeouts, stream=True)
+                first_byte = time.perf_counter()
+                if page_of is not None and response.status_code == 200:
+                    content = self._read_page(response, page_of, deadline, metrics)
+                else:
+                    content = response.content
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                if metrics is not None:
+                    metrics.requests += 1
+                    metrics.wait_s += requested - started
+                    metrics.connect_s += _connect_timing.seconds
+                # A timeout cut short by the deadline says nothing about the source
+                cut_short = (timeouts[0] < self.connect_timeout if isinstance(e, requests.ConnectTimeout)
+                             else timeouts[1] < self.read_timeout)
+                if isinstance(e, requests.Timeout) and cut_short:
+                    raise RunDeadlineExceeded(f"timed out at the run deadline ({e})") from e
+                if attempt == self.retries or not self._backoff(attempt, url, type(e).__name__, deadline):
+                    raise
+                if metrics is not None:
+                    metrics.retries += 1
+                continue
+            if metrics is not None:
+                metrics.requests += 1
+                metrics.bytes += len(content)
+                metrics.status_codes.append(response.status_code)
+                metrics.wait_s += requested - started
+                metrics.connect_s += _connect_timing.seconds
+                metrics.ttfb_s += first_byte - requested
+                metrics.download_s += time.perf_counter() - first_byte
+            if (response.status_code not in RETRYABLE_STATUS or attempt == self.retries
+                    or not self._backoff(attempt, url, response.status_code, deadline,
+                                         response.headers.get("Retry-After"))):
+                return response
+            if metrics is not None:
+                metrics.retries += 1
+
+    def scrape_source(self, source: SourceConfig) -> List[NewsArticle]:
+        """Scrape a source from its feed when available, falling back to the HTML page"""
+        metrics = self.metrics.setdefault(source.key, SourceMetrics(source.key))
+        if source.feed_url and self.use_feeds:
+            try:
+                metrics.mode = "feed"
+                articles = self._fetch_cached(source, source.feed_url,
+                                              lambda content, stats: extract_feed_articles(source, content, stats),
+                                              metrics)
+                if articles:
+                    metrics.kept = len(articles)
+                    logger.info(f"Scraped {len(articles)} articles from {source.name} feed")
+                    return articles
+                logger.info(f"{source.name} feed had no usable articles, falling back to HTML")
+            except RunDeadlineExceeded:
+                raise
+            except Exception as e:
+                metrics.record_error(e)
+                logger.warning(f"{source.name} feed failed ({e}), falling back to HTML")
+
+        metrics.mode = "html"
+        articles = self._fetch_cached(source, source.url,
+                                      lambda content, stats: self.parse(source, content, stats), metrics,
+                                      page=True)
+        metrics.kept = len(articles)
+        logger.info(f"Scraped {len(articles)} articles from {source.name}")
+        return articles
+
+    def _fetch_cached(self, source: SourceConfig, url: str, extract,
+                      metrics: Optional[SourceMetrics] = None, page: bool = False) -> List[NewsArticle]:
+        """Conditionally GET a URL and extract its articles, reusing cached results when unchanged"""
+        extractor = source.extractor_fingerprint(self.parser)
+        entry = self.http_cache.lookup(url) if self.http_cache else None
+        if entry is not None and entry.get("extractor") != extractor:
+            # Articles from another extractor are stale even if the page is not
+            entry = None
+        response = self.fetch(url, headers=HTTPCache.conditional_headers(entry), metrics=metrics,
+                              page_of=source if page else None)
+
+        if entry is not None and response.status_code == 304:
+            self.http_cache.refresh(url, entry, response)
+            if metrics is not None:
+                metrics.cache_hits += 1
+            logger.info(f"{source.name} not modified, reusing {len(entry['articles'])} cached articles")
+            return [NewsArticle.from_dict(data) for data in entry["articles"]]
+        response.raise_for_status()
 
-    def scrape_wafa(self) -> List[NewsArticle]:
-        """Scrape WAFA News"""
+        body_hash = hashlib.sha256(response.content).hexdigest()
+        if entry is not None and entry.get("bodyHash") == body_hash:
+            self.http_cache.refresh(url, entry, response)
+            if metrics is not None:
+                metrics.cache_hits += 1
+            logger.info(f"{source.name} unchanged, reusing {len(entry['articles'])} cached articles")
+            return [NewsArticle.from_dict(data) for data in entry["articles"]]
+
+        stats: Dict[str, int] = {}
+        started = time.perf_counter()
+        articles = extract(response.content, stats)
+        if metrics is not None:
+            metrics.parse_s += time.perf_counter() - started
+            metrics.add_stats(stats)
+        if self.http_cache:
+            self.http_cache.store(url, response, body_hash, articles, extractor)
+        return articles
+
+    def parse(self, source: SourceConfig, content: bytes,
+              stats: Optional[Dict[str, int]] = None) -> List[NewsArticle]:
+        """Extract articles from a fetched page, on the parser process pool when enabled.
+
+        Only the raw bytes go to the worker and only plain dicts come back,
+        so fetch threads keep downloading while other cores parse.
+        """
+        if self.parse_workers <= 0:
+            return extract_articles(source, content, self.parser, stats)
+
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        future = self._parse_pool.submit(parse_source_page, source, content, self.parser,
+                                         NewsArticle.run_timestamp())
+        articles, worker_stats = future.result()
+        if stats is not None:
+            for name, value in worker_stats.items():
+                stats[name] = stats.get(name, 0) + value
+        return [NewsArticle.from_dict(data) for data in articles]
+
+    def close(self):
+        """Release the parser process pool and HTTP connections"""
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        self.session.close()
+
+    def _run_source(self, source: SourceConfig, deadline: Optional[float] = None) -> List[NewsArticle]:
+        """Scrape a single source, isolating its failures from the others"""
+        metrics = self.metrics.setdefault(source.key, SourceMetrics(source.key))
+        if self.circuit_breaker is not None and not self.circuit_breaker.allow(source.key):
+            metrics.mode = "circuit-open"
+            logger.warning(f"Skipping {source.name}: circuit open after repeated failures")
+            return []
+        self._run_deadline.value = deadline
+        started = time.perf_counter()
         try:
-            url = "https://english.wafa.ps/"
-            response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            articles = []
-            # Look for article links
-            article_links = soup.find_all('a', href=re.compile(r'/Pages/'))
-            
-            seen_urls = set()
-            for link in article_links[:10]:
-                try:
-                    article_url = urljoin(url, link.get('href'))
-                    if article_url in seen_urls:
-                        continue
-                    seen_urls.add(article_url)
-                    
-                    title = link.get_text(strip=True)
-                    if len(title) < 10:
-                        continue
-                    
-                    article = NewsArticle(
-                        title=title,
-                        summary=title,
-                        url=article_url,
-                        source="WAFA",
-                        tags=["Palestine", "Official", "Government"],
-                        category="News",
-                        priority=3
-                    )
-                    articles.append(article)
-                    
-                except Exception as e:
-                    logger.warning(f"Error parsing WAFA article: {e}")
-                    continue
-            
-            logger.info(f"Scraped {len(articles)} articles from WAFA")
+            articles = self.scrape_source(source)
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_success(source.key)
             return articles
-            
+        except RunDeadlineExceeded as e:
+            metrics.record_deadline(e)
+            logger.warning(f"{source.name} ran out of time: {e}")
+            return []
         except Exception as e:
-            logger.error(f"Error scraping WAFA: {e}")
+            metrics.record_error(e)
+            logger.error(f"Error scraping {source.name}: {e}")
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_failure(source.key)
             return []
+        finally:
+            self._run_deadline.value = None
+            metrics.total_s = time.perf_counter() - started
 
-    def scrape_all_sources(self) -> List[NewsArticle]:
-        """Scrape all news sources"""
-        all_articles = []
-        
-        scrapers = [
-            self.scrape_aljazeera_gaza,
-            self.scrape_middle_east_eye,
-            self.scrape_972_magazine,
-            self.scrape_electronic_intifada,
-            self.scrape_imemc,
-            self.scrape_palestine_chronicle,
-            self.scrape_wafa
-        ]
-        
-        for scraper in scrapers:
-            try:
-                articles = scraper()
-                all_articles.extend(articles)
-                time.sleep(2)  # Be respectful to servers
-            except Exception as e:
-                logger.error(f"Error in scraper {scraper.__name__}: {e}")
+    def scrape_sources(self, sources: List[SourceConfig]) -> Dict[str, List[NewsArticle]]:
+        """Scrape the given sources concurrently, returning their articles by source key.
+
+        With a time budget, sources still running at the deadline are
+        abandoned (their requests are already capped to it) and the others'
+        results are returned.
+        """
+        NewsArticle.start_run()
+        self.metrics = {source.key: SourceMetrics(source.key) for source in sources}
+        deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        self.deadline = deadline
+
+        # Politeness is enforced per host by the rate limiter, so independent
+        # sources can be fetched in parallel
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(sources))))
+        try:
+            futures = {source.key: executor.submit(self._run_source, source, deadline) for source in sources}
+            wait(list(futures.values()), timeout=self.time_budget or None)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        results = {}
+        for source in sources:
+            future = futures[source.key]
+            if future.done() and not future.cancelled():
+                results[source.key] = future.result()
                 continue
-        
-        # Remove duplicates based on ID
+            self.metrics[source.key].record_deadline(RunDeadlineExceeded(
+                "not started before the run deadline" if future.cancelled() else "still running at the run deadline"))
+            logger.warning(f"{source.name} did not finish before the run deadline")
+            results[source.key] = []
+        return results
+
+    def deduplicate(self, articles: List[NewsArticle]) -> List[NewsArticle]:
+        """Remove exact duplicates by ID, then collapse near-duplicate stories"""
         unique_articles = {}
-        for article in all_articles:
+        for article in articles:
             unique_articles[article.id] = article
         
         final_articles = list(unique_articles.values())
+        if self.near_duplicate_threshold:
+            final_articles = cluster_near_duplicates(final_articles, self.near_duplicate_threshold)
+        return final_articles
+
+    def scrape_all_sources(self) -> List[NewsArticle]:
+        """Scrape all news sources"""
+        all_articles = []
+        for articles in self.scrape_sources(self.sources).values():
+            all_articles.extend(articles)
+        
+        final_articles = self.deduplicate(all_articles)
         logger.info(f"Total unique articles scraped: {len(final_articles)}")
         
         return final_articles
 
-    def save_articles_to_json(self, articles: List[NewsArticle], filename: str = "articles.json"):
-        """Save articles to JSON file"""
-        data = {
-            "articles": [article.to_dict() for article in articles],
+    def load_articles_from_json(self, filename: str = "articles.json") -> List[NewsArticle]:
+        """Load articles from a previously saved JSON (or NDJSON) file"""
+        try:
+            with open(filename, 'rb') as f, _gc_paused():
+                content = f.read()
+                try:
+                    data = _json_loads(content)
+                except ValueError:
+                    data = None
+                if not isinstance(data, dict) or "articles" not in data:
+                    # --format ndjson output: one article per line
+                    data = {"articles": [_json_loads(line) for line in content.splitlines() if line.strip()]}
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read previous articles from {filename}: {e}")
+            return []
+
+        articles = []
+        with _gc_paused():
+            for item in data["articles"]:
+                try:
+                    articles.append(NewsArticle.from_dict(item))
+                except (KeyError, TypeError) as e:
+                    logger.warning(f"Skipping malformed article in {filename}: {e}")
+        return articles
+
+    def merge_articles(self, new_articles: List[NewsArticle], previous_articles: List[NewsArticle],
+                       max_age_days: float = 7, max_articles: int = 500,
+                       first_seen: Optional[Dict[str, Dict]] = None) -> List[NewsArticle]:
+        """Merge a fresh scrape into the previous output.
+
+        Articles that were already known keep their original timestamps so
+        their records (and the sort order) stay stable between runs. Entries
+        older than `max_age_days` are evicted, then only the newest
+        `max_articles` are kept.
+
+        `first_seen` (article id -> {"publishedAt", "scrapedAt", "lastSeen"})
+        remembers the timestamps of every scraped article beyond the output
+        and is updated in place. An article that was evicted or absorbed
+        into a near-duplicate but is still on a source page then keeps its
+        original timestamps, so it stays evicted instead of returning as new.
+        Entries not seen for `max_age_days` are forgotten.
+        """
+        previous = {article.id: article for article in previous_articles}
+        merged = dict(previous)
+        added = 0
+        now = time.time()
+
+        for article in new_articles:
+            known = previous.get(article.id)
+            seen = first_seen.get(article.id) if first_seen is not None else None
+            if known is not None:
+                article.published_at = known.published_at
+                article.scraped_at = known.scraped_at
+                article.add_related(known)
+            elif seen is not None:
+                article.published_at = seen["publishedAt"]
+                article.scraped_at = seen["scrapedAt"]
+            else:
+                added += 1
+            if first_seen is not None:
+                first_seen[article.id] = {"publishedAt": article.published_at, "scrapedAt": article.scraped_at,
+                                          "lastSeen": now}
+            merged[article.id] = article
+
+        if first_seen is not None:
+            forget_before = now - max_age_days * 86400
+            for article_id in [article_id for article_id, seen in first_seen.items()
+                               if seen.get("lastSeen", 0) < forget_before]:
+                del first_seen[article_id]
+
+        candidates = list(merged.values())
+        if self.near_duplicate_threshold:
+            # Catch stories that other sources already reported in earlier runs
+            candidates = cluster_near_duplicates(candidates, self.near_duplicate_threshold)
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        kept = [article for article in candidates if _parse_timestamp(article.published_at) >= cutoff]
+        kept.sort(key=lambda x: x.published_at, reverse=True)
+        kept = kept[:max_articles]
+
+        logger.info(f"Merged {added} new articles into {len(previous)} previous ones, "
+                    f"evicted {len(candidates) - len(kept)}")
+        return kept
+
+    def save_articles_to_json(self, articles: List[NewsArticle], filename: str = "articles.json",
+                              extra_targets: Optional[List[str]] = None, fmt: str = "json"):
+        """Save articles to JSON file (and any extra targets) in one streaming, atomic pass"""
+        write_articles((article.to_dict() for article in articles), [filename] + (extra_targets or []), fmt=fmt)
+        logger.info(f"Saved {len(articles)} articles to {filename}")
+
+    def save_sharded_output(self, articles: List[NewsArticle], output_dir: str = "public/data",
+                            cache_dir: str = ".cache/shards"):
+        """Write a manifest plus content-hashed, precompressed shards per source and day.
+
+        Shard names change whenever their content does, so they can be
+        cached immutably; only the small manifest needs revalidating.
+        Shards listed in the previous manifest are kept (and restored from
+        `cache_dir` when the output directory starts out empty, as on a
+        fresh CI runner), so clients holding the old manifest can still
+        finish loading. Anything older is removed.
+        """
+        shard_dir = os.path.join(output_dir, "shards")
+        os.makedirs(shard_dir, exist_ok=True)
+        os.makedirs(cache_dir, exist_ok=True)
+        manifest_path = os.path.join(output_dir, "manifest.json")
+        previous_paths = set()
+        for path in (os.path.join(cache_dir, "manifest.json"), manifest_path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    previous_paths = {shard["path"] for shard in json.load(f).get("shards", [])}
+                break
+            except (OSError, ValueError):
+                continue
+
+        groups: Dict[Tuple[str, str], List[NewsArticle]] = {}
+        for article in articles:
+            groups.setdefault((article.source, article.published_at[:10]), []).append(article)
+
+        shards = []
+        for (source, day), members in groups.items():
+            payload = json.dumps(
+                {"source": source, "date": day, "articles": [article.to_dict() for article in members]},
+                separators=(',', ':'), ensure_ascii=False
+            ).encode('utf-8')
+            digest = hashlib.sha256(payload).hexdigest()[:12]
+            name = f"{_slugify(source)}-{day}.{digest}.json"
+            path = os.path.join(shard_dir, name)
+            if not os.path.exists(path):
+                _write_precompressed(path, payload)
+            if not os.path.exists(os.path.join(cache_dir, name)):
+                _atomic_write_bytes(os.path.join(cache_dir, name), payload)
+            shards.append({
+                "path": f"shards/{name}",
+                "source": source,
+                "date": day,
+                "count": len(members),
+                "bytes": len(payload),
+                "newest": max(article.published_at for article in members)
+            })
+
+        restored = 0
+        for shard_path in previous_paths - {shard["path"] for shard in shards}:
+            name = os.path.basename(shard_path)
+            if os.path.exists(os.path.join(shard_dir, name)):
+                continue
+            try:
+                with open(os.path.join(cache_dir, name), 'rb') as f:
+                    _write_precompressed(os.path.join(shard_dir, name), f.read())
+                restored += 1
+            except OSError:
+                logger.warning(f"Shard {name} from the previous manifest is no longer cached")
+
+        # Newest shards first so clients can render before fetching the rest
+        shards.sort(key=lambda shard: shard["newest"], reverse=True)
+        manifest = json.dumps({
             "lastUpdated": datetime.now(timezone.utc).isoformat(),
-            "totalArticles": len(articles)
+            "totalArticles": len(articles),
+            "shards": shards
+        }, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        _write_precompressed(manifest_path, manifest)
+        _atomic_write_bytes(os.path.join(cache_dir, "manifest.json"), manifest)
+
+        keep = {os.path.basename(shard["path"]) for shard in shards} | {os.path.basename(path) for path in previous_paths}
+        for directory in (shard_dir, cache_dir):
+            for name in os.listdir(directory):
+                base = re.sub(r'\.(gz|br)$', '', name)
+                if base != "manifest.json" and base not in keep:
+                    os.remove(os.path.join(directory, name))
+
+        logger.info(f"Saved {len(articles)} articles in {len(shards)} shards to {output_dir}"
+                    + (f", restored {restored} previous shards" if restored else ""))
+
+_ARTICLE_LD_TYPES = {"NewsArticle", "Article", "ReportageNewsArticle", "AnalysisNewsArticle", "BlogPosting"}
+
+def _meta_content(soup: BeautifulSoup, *keys: str) -> str:
+    for key in keys:
+        elem = soup.find('meta', attrs={'property': key}) or soup.find('meta', attrs={'name': key})
+        if elem and elem.get('content'):
+            return elem['content'].strip()
+    return ""
+
+def _json_ld_article(soup: BeautifulSoup) -> Dict:
+    """Return the first article-like JSON-LD object on the page"""
+    for script in soup.find_all('script', attrs={'type': 'application/ld+json'}):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        items = data if isinstance(data, list) else data.get("@graph", [data]) if isinstance(data, dict) else []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            types = item.get("@type")
+            types = set(types) if isinstance(types, list) else {types}
+            if types & _ARTICLE_LD_TYPES or "datePublished" in item:
+                return item
+    return {}
+
+def _json_ld_name(value) -> str:
+    """Flatten a JSON-LD author/image value (string, object or list) to a string"""
+    if isinstance(value, list):
+        return ", ".join(filter(None, (_json_ld_name(item) for item in value)))
+    if isinstance(value, dict):
+        return value.get("name") or value.get("url") or ""
+    return value if isinstance(value, str) else ""
+
+def _normalize_timestamp(value: str) -> str:
+    """Convert a page date to UTC ISO 8601, or "" if it cannot be parsed"""
+    parsed = _parse_timestamp(value.strip().replace("Z", "+00:00")) if value else None
+    if parsed is None or parsed.year == datetime.min.year:
+        return ""
+    return parsed.astimezone(timezone.utc).isoformat()
+
+_METADATA_STRAINER = SoupStrainer(['meta', 'script', 'time'])
+
+def extract_page_metadata(content: bytes, base_url: str, parser: str = DEFAULT_PARSER) -> Dict[str, str]:
+    """Pull summary, author, publication date and lead image from an article page"""
+    soup = BeautifulSoup(content, parser, parse_only=_METADATA_STRAINER)
+    ld = _json_ld_article(soup)
+
+    summary = _meta_content(soup, 'og:description', 'description', 'twitter:description') or ld.get("description", "")
+    author = _meta_content(soup, 'author', 'article:author') or _json_ld_name(ld.get("author"))
+    published = (_meta_content(soup, 'article:published_time', 'og:article:published_time', 'date')
+                 or ld.get("datePublished", ""))
+    if not published:
+        time_elem = soup.find('time', attrs={'datetime': True})
+        published = time_elem['datetime'] if time_elem else ""
+    image = _meta_content(soup, 'og:image', 'twitter:image') or _json_ld_name(ld.get("image"))
+
+    return {
+        "summary": summary.strip() if isinstance(summary, str) else "",
+        "author": author.strip(),
+        "publishedAt": _normalize_timestamp(published) if isinstance(published, str) else "",
+        "imageUrl": urljoin(base_url, image) if image else ""
+    }
+
+def interleave_by_host(urls: Iterable[str]) -> List[str]:
+    """Order URLs round-robin across their hosts.
+
+    Each host has its own politeness slot, so a worker pool fed one host's
+    URLs after another would queue on a single host at a time.
+    """
+    by_host: Dict[str, List[str]] = {}
+    for url in urls:
+        by_host.setdefault(urlparse(url).netloc, []).append(url)
+    queues = list(by_host.values())
+    return [queue[i] for i in range(max(map(len, queues), default=0)) for queue in queues if i < len(queue)]
+
+class ArticleEnricher:
+    """Fill in article details from the article pages themselves.
+
+    Metadata is cached on disk by URL, so each article page is fetched
+    once across all runs. Pages that are gone (a 4xx answer) are cached
+    as empty results for the same reason; other failures are retried
+    after RETRY_FAILED_AFTER seconds.
+    """
+
+    RETRY_FAILED_AFTER = 24 * 3600
+
+    def __init__(self, scraper: "NewsScraper", cache_path: str = ".cache/enrich.json",
+                 max_workers: int = 4, max_entries: int = 5000):
+        self.scraper = scraper
+        self.cache_path = cache_path
+        self.max_workers = max(1, max_workers)
+        self.max_entries = max_entries
+        self.cache = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        # Dicts keep insertion order, so the oldest lookups are evicted first
+        while len(self.cache) > self.max_entries:
+            del self.cache[next(iter(self.cache))]
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        _atomic_write_bytes(self.cache_path, json.dumps(self.cache, ensure_ascii=False).encode('utf-8'))
+
+    def _fetch_metadata(self, url: str, deadline: Optional[float] = None) -> Optional[Dict]:
+        try:
+            with self.scraper.run_deadline(deadline):
+                response = self.scraper.fetch(url)
+            response.raise_for_status()
+            return extract_page_metadata(response.content, url, self.scraper.parser)
+        except RunDeadlineExceeded:
+            # Not the page's fault; try again next run
+            return None
+        except Exception as e:
+            logger.warning(f"Could not enrich {url}: {e}")
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status is not None and 400 <= status < 500 and status not in (408, 429):
+                return {}
+            return {"failedAt": time.time()}
+
+    def _is_pending(self, url: str, now: float) -> bool:
+        cached = self.cache.get(url)
+        return cached is None or now - cached.get("failedAt", now) > self.RETRY_FAILED_AFTER
+
+    def enrich(self, articles: List[NewsArticle]) -> List[NewsArticle]:
+        """Fetch metadata for uncached (or retryable) article URLs and apply it to every article"""
+        now = time.time()
+        pending = interleave_by_host(dict.fromkeys(
+            article.url for article in articles if self._is_pending(article.url, now)))
+        deadline = self.scraper.deadline
+        if pending and deadline is not None and time.monotonic() >= deadline:
+            logger.warning(f"No time left in the run budget to enrich {len(pending)} article pages")
+            pending = []
+        if pending:
+            fetched = 0
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                for url, metadata in zip(pending, executor.map(lambda url: self._fetch_metadata(url, deadline),
+                                                               pending)):
+                    if metadata is None:
+                        continue
+                    # Re-insert so retried entries move to the newest end of the cache
+                    self.cache.pop(url, None)
+                    self.cache[url] = metadata
+                    fetched += 1
+            self._save_cache()
+            logger.info(f"Enriched {fetched} new article pages"
+                        + (f", {len(pending) - fetched} left for the next run" if fetched < len(pending) else ""))
+
+        for article in articles:
+            metadata = self.cache.get(article.url) or {}
+            if metadata.get("summary") and (not article.summary or article.summary == article.title):
+                article.summary = metadata["summary"]
+            if metadata.get("author") and not article.author:
+                article.author = metadata["author"]
+            if metadata.get("publishedAt"):
+                article.published_at = metadata["publishedAt"]
+            if metadata.get("imageUrl") and not article.image_url:
+                article.image_url = metadata["imageUrl"]
+        return articles
+
+class ThumbnailPipeline:
+    """Serve article images as small local thumbnails instead of remote originals.
+
+    Each image URL is downloaded once and its bytes are kept under their
+    content hash in `cache_dir`. WebP and AVIF thumbnails (whatever the
+    installed Pillow can encode) are written to `output_dir` in a few
+    widths, never upscaled. Articles then point at the local WebP
+    thumbnail and list a srcset per MIME type in `imageSources`. Images
+    no article references any more are evicted along with their
+    thumbnails. Without Pillow, articles are left unchanged.
+    """
+
+    MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+    RETRY_FAILED_AFTER = 24 * 3600
+
+    def __init__(self, scraper: "NewsScraper", output_dir: str = "public/thumbs", url_prefix: str = "/thumbs",
+                 cache_dir: str = ".cache/images", widths: Tuple[int, ...] = (320, 640, 960),
+                 default_width: int = 640, max_workers: int = 4, max_bytes: int = 10 * 1024 * 1024):
+        self.scraper = scraper
+        self.output_dir = output_dir
+        self.url_prefix = url_prefix.rstrip('/')
+        self.cache_dir = cache_dir
+        self.widths = tuple(sorted(set(widths)))
+        self.default_width = default_width
+        self.max_workers = max(1, max_workers)
+        self.max_bytes = max_bytes
+        self.state_path = os.path.join(cache_dir, "index.json")
+        self.formats = [fmt for fmt in ("avif", "webp") if Image is not None and features.check(fmt)] or ["jpeg"]
+        self._lock = threading.Lock()
+        self._writing: Set[str] = set()
+        # Thumbnail URL prefix -> remote image URL for images evicted by the last process()
+        self.evicted: Dict[str, str] = {}
+        self.state = {"urls": {}, "images": {}}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def _download(self, url: str) -> Optional[str]:
+        """Fetch an image and write its thumbnails; returns its content hash"""
+        try:
+            response = self.scraper.fetch(url)
+            response.raise_for_status()
+            content = response.content
+            if len(content) > self.max_bytes:
+                raise ValueError(f"{len(content)} bytes is over the {self.max_bytes} byte limit")
+            image_hash = hashlib.sha256(content).hexdigest()[:20]
+            # Several URLs can serve the same bytes; only one thread writes them
+            with self._lock:
+                if image_hash in self.state["images"] or image_hash in self._writing:
+                    return image_hash
+                self._writing.add(image_hash)
+            try:
+                self._write_thumbnails(image_hash, content)
+            finally:
+                with self._lock:
+                    self._writing.discard(image_hash)
+            return image_hash
+        except Exception as e:
+            logger.warning(f"Could not make thumbnails for {url}: {e}")
+            return None
+
+    def _write_thumbnails(self, image_hash: str, content: bytes):
+        with Image.open(io.BytesIO(content)) as image:
+            image.load()
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+            original_width, original_height = image.size
+            os.makedirs(self.cache_dir, exist_ok=True)
+            _atomic_write_bytes(os.path.join(self.cache_dir, image_hash), content)
+            os.makedirs(self.output_dir, exist_ok=True)
+
+            sources: Dict[str, str] = {}
+            files: List[str] = []
+            widths = sorted({min(width, original_width) for width in self.widths})
+            for fmt in self.formats:
+                candidates = []
+                for width in widths:
+                    height = max(1, round(original_height * width / original_width))
+                    thumb = image.resize((width, height), Image.LANCZOS) if width != original_width else image
+                    if fmt == "jpeg" and thumb.mode == "RGBA":
+                        thumb = thumb.convert("RGB")
+                    buffer = io.BytesIO()
+                    thumb.save(buffer, format=fmt.upper(), quality=50 if fmt == "avif" else 75)
+                    name = f"{image_hash}-{width}.{fmt}"
+                    _atomic_write_bytes(os.path.join(self.output_dir, name), buffer.getvalue())
+                    files.append(name)
+                    candidates.append(f"{self.url_prefix}/{name} {width}w")
+                sources[self.MIME_TYPES[fmt]] = ", ".join(candidates)
+
+        fallback = "webp" if "webp" in self.formats else self.formats[-1]
+        src_width = max([width for width in widths if width <= self.default_width] or widths[:1])
+        with self._lock:
+            self.state["images"][image_hash] = {
+                "src": f"{self.url_prefix}/{image_hash}-{src_width}.{fallback}",
+                "sources": sources,
+                "files": files
+            }
+
+    def _rebuild(self, image_hash: str) -> bool:
+        """Write an image's thumbnails again from its cached original"""
+        try:
+            with open(os.path.join(self.cache_dir, image_hash), 'rb') as f:
+                content = f.read()
+            self._write_thumbnails(image_hash, content)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not rebuild thumbnails for image {image_hash}: {e}")
+            return False
+
+    def process(self, articles: List[NewsArticle]) -> List[NewsArticle]:
+        """Point articles at local thumbnails, creating those missing, and evict unused ones"""
+        if Image is None:
+            logger.warning("Pillow is not installed, keeping remote image URLs")
+            return articles
+
+        local_prefix = f"{self.url_prefix}/"
+        self.evicted = {}
+        remote_urls = {image_hash: url for url, image_hash in self.state["urls"].items() if isinstance(image_hash, str)}
+        for article in articles:
+            # Articles from the previous output already point at a thumbnail;
+            # resolve them like new ones so their files get checked as well
+            if article.image_url.startswith(local_prefix):
+                image_hash = article.image_url[len(local_prefix):].split('-', 1)[0]
+                article.image_url = remote_urls.get(image_hash, article.image_url)
+
+        now = time.time()
+        pending = []
+        missing = set()
+        for article in articles:
+            url = article.image_url
+            if not url.startswith(("http://", "https://")) or url in pending:
+                continue
+            known = self.state["urls"].get(url)
+            if known is None or (isinstance(known, dict) and now - known.get("failedAt", 0) > self.RETRY_FAILED_AFTER):
+                pending.append(url)
+            elif isinstance(known, str) and known in self.state["images"] and not all(
+                    os.path.exists(os.path.join(self.output_dir, name)) for name in self.state["images"][known]["files"]):
+                missing.add(known)
+
+        if missing:
+            # The output directory is not persisted everywhere (e.g. CI runners);
+            # rebuild thumbnails from the cached originals, or download again
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+                rebuilt = dict(zip(missing, executor.map(self._rebuild, missing)))
+            for image_hash, ok in rebuilt.items():
+                if not ok:
+                    del self.state["images"][image_hash]
+                    lost = [url for url, known in self.state["urls"].items() if known == image_hash]
+                    for url in lost:
+                        del self.state["urls"][url]
+                    pending.extend(url for url in lost if url not in pending)
+            logger.info(f"Rebuilt thumbnails for {sum(rebuilt.values())} cached images")
+
+        if pending:
+            # Round-robin across hosts so the workers do not all wait on one host's politeness slot
+            pending = interleave_by_host(pending)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                for url, image_hash in zip(pending, executor.map(self._download, pending)):
+                    self.state["urls"][url] = image_hash if image_hash else {"failedAt": now}
+            logger.info(f"Downloaded {len(pending)} new article images")
+
+        used = set()
+        for article in articles:
+            if article.image_url.startswith(local_prefix):
+                # Only left for images whose remote URL is no longer known
+                image_hash = article.image_url[len(local_prefix):].split('-', 1)[0]
+                image = self.state["images"].get(image_hash)
+                if image is not None and (all(os.path.exists(os.path.join(self.output_dir, name))
+                                              for name in image["files"]) or self._rebuild(image_hash)):
+                    used.add(image_hash)
+                else:
+                    logger.warning(f"Dropping image of {article.url}: thumbnail {article.image_url} is gone")
+                    article.image_url, article.image_sources = "", {}
+                continue
+            image_hash = self.state["urls"].get(article.image_url)
+            if isinstance(image_hash, str) and image_hash in self.state["images"]:
+                image = self.state["images"][image_hash]
+                article.image_url = image["src"]
+                article.image_sources = dict(image["sources"])
+                used.add(image_hash)
+
+        self._evict(used)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _atomic_write_bytes(self.state_path, json.dumps(self.state, ensure_ascii=False).encode('utf-8'))
+        return articles
+
+    def _evict(self, used: Set[str]):
+        unused = [image_hash for image_hash in self.state["images"] if image_hash not in used]
+        remote_urls = {image_hash: url for url, image_hash in self.state["urls"].items() if isinstance(image_hash, str)}
+        for image_hash in unused:
+            if image_hash in remote_urls:
+                self.evicted[f"{self.url_prefix}/{image_hash}-"] = remote_urls[image_hash]
+            for path in [os.path.join(self.cache_dir, image_hash)] + [
+                    os.path.join(self.output_dir, name) for name in self.state["images"][image_hash]["files"]]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            del self.state["images"][image_hash]
+        # Expired failures would be retried anyway, so forget them instead of keeping them forever
+        retry_before = time.time() - self.RETRY_FAILED_AFTER
+        self.state["urls"] = {
+            url: image_hash for url, image_hash in self.state["urls"].items()
+            if (image_hash in self.state["images"] if isinstance(image_hash, str)
+                else image_hash.get("failedAt", 0) > retry_before)
         }
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Saved {len(articles)} articles to {filename}")
+        if unused:
+            logger.info(f"Evicted {len(unused)} images no longer used by any article")
+
+def _fsync_directory(path: str):
+    """Make a rename durable; not supported on every platform"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _atomic_write_bytes(path: str, payload: bytes):
+    """Replace a file with `payload` so readers (and a crash) never see it half-written"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(path)
+
+def _json_loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def encode_article_batch(articles: List[Dict], fmt: str = "json") -> bytes:
+    """Encode a batch of article dicts in one encoder call.
+
+    ``json`` returns the items as they appear inside the indented
+    articles.json array (each preceded by a newline), ``ndjson`` one line
+    per article. orjson is used when installed, the stdlib otherwise; both
+    produce the same bytes.
+    """
+    if fmt == "ndjson":
+        if orjson is not None:
+            return b"".join(orjson.dumps(article, option=orjson.OPT_APPEND_NEWLINE) for article in articles)
+        return "".join(json.dumps(article, ensure_ascii=False, separators=(',', ':')) + "\n"
+                       for article in articles).encode('utf-8')
+    # Indenting the batch as the document's "articles" value yields exactly
+    # the lines between its brackets
+    document = {"articles": articles}
+    if orjson is not None:
+        encoded = orjson.dumps(document, option=orjson.OPT_INDENT_2)
+    else:
+        encoded = json.dumps(document, indent=2, ensure_ascii=False).encode('utf-8')
+    return encoded[len(b'{\n  "articles": ['):-len(b'\n  ]\n}')]
+
+class AtomicArticleWriter:
+    """Stream article dicts to one or more files in a single pass.
+
+    ``json`` produces the same layout as ``json.dump(data, indent=2)`` of the
+    articles.json document; ``ndjson`` writes one article per line. Articles
+    are encoded in batches of ``batch_size``, so memory stays bounded. Each
+    target is written to a temp file in its own directory, fsynced and
+    renamed into place, so readers see either the old or the new file and
+    never a partial one. With ``append=True`` (NDJSON only) lines are
+    appended to the existing targets instead.
+    """
+
+    def __init__(self, targets: List[str], fmt: str = "json", append: bool = False, batch_size: int = 1000):
+        if fmt not in ("json", "ndjson"):
+            raise ValueError(f"unknown output format: {fmt}")
+        if append and fmt != "ndjson":
+            raise ValueError("only NDJSON output can be appended to")
+        self.targets = list(dict.fromkeys(targets))
+        self.fmt = fmt
+        self.append = append
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch: List[Dict] = []
+        self._files = []
+
+    def __enter__(self):
+        for target in self.targets:
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            if self.append:
+                self._files.append((target, None, open(target, 'ab')))
+            else:
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target) or ".",
+                                                prefix=f".{os.path.basename(target)}.", suffix=".tmp")
+                self._files.append((target, tmp_path, os.fdopen(fd, 'wb')))
+        if self.fmt == "json":
+            self._write(b'{\n  "articles": [')
+        return self
+
+    def _write(self, payload: bytes):
+        for _, _, f in self._files:
+            f.write(payload)
+
+    def _flush_batch(self):
+        if not self._batch:
+            return
+        if self.fmt == "json" and self.count > len(self._batch):
+            self._write(b",")
+        self._write(encode_article_batch(self._batch, self.fmt))
+        self._batch = []
+
+    def write(self, article: Dict):
+        """Queue one article dict for every target"""
+        self._batch.append(article)
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self._flush_batch()
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._flush_batch()
+                if self.fmt == "json":
+                    closing = "\n  ]" if self.count else "]"
+                    self._write(f'{closing},\n  "lastUpdated": {json.dumps(datetime.now(timezone.utc).isoformat())},'
+                                f'\n  "totalArticles": {self.count}\n}}'.encode('utf-8'))
+            for _, _, f in self._files:
+                if exc_type is None:
+                    f.flush()
+                    os.fsync(f.fileno())
+                f.close()
+        finally:
+            for target, tmp_path, _ in self._files:
+                if tmp_path is None:
+                    continue
+                if exc_type is None:
+                    os.replace(tmp_path, target)
+                    _fsync_directory(target)
+                elif os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+def write_articles(articles: Iterable[Dict], targets: List[str], fmt: str = "json", append: bool = False) -> int:
+    """Write article dicts to every target atomically; returns the number written"""
+    with AtomicArticleWriter(targets, fmt=fmt, append=append) as writer:
+        for article in articles:
+            writer.write(article)
+    return writer.count
+
+class ArticleStore:
+    """SQLite-backed archive of every article ever scraped.
+
+    Rows keep the timestamps of the first time an article was seen, like
+    merge_articles(). Exports stream from an index-ordered cursor, so
+    writing a window of the archive never loads the whole history.
+    """
+
+    COLUMNS = ("id", "title", "summary", "url", "source", "author", "published_at", "scraped_at",
+               "image_url", "tags", "category", "priority", "related_sources", "image_sources")
+
+    def __init__(self, path: str = "articles.db"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                url TEXT NOT NULL,
+                source TEXT NOT NULL,
+                author TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                scraped_at TEXT NOT NULL,
+                image_url TEXT NOT NULL,
+                tags TEXT NOT NULL,
+                category TEXT NOT NULL,
+                priority INTEGER NOT NULL,
+                related_sources TEXT NOT NULL,
+                image_sources TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source, published_at);
+            CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles (published_at);
+            CREATE INDEX IF NOT EXISTS idx_articles_category ON articles (category, published_at);
+            CREATE INDEX IF NOT EXISTS idx_articles_feed_order ON articles (priority, published_at);
+        """)
+        # Archives created before thumbnails existed lack the column
+        if "image_sources" not in {row[1] for row in self.conn.execute("PRAGMA table_info(articles)")}:
+            self.conn.execute("ALTER TABLE articles ADD COLUMN image_sources TEXT NOT NULL DEFAULT '{}'")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def upsert(self, articles: List[NewsArticle]) -> int:
+        """Insert new articles and update known ones in one transaction; returns how many were new"""
+        rows = [(
+            article.id, article.title, article.summary, article.url, article.source, article.author,
+            article.published_at, article.scraped_at, article.image_url,
+            json.dumps(article.tags, ensure_ascii=False), article.category, article.priority,
+            json.dumps(article.related_sources, ensure_ascii=False),
+            json.dumps(article.image_sources, ensure_ascii=False)
+        ) for article in articles]
+
+        count_query = "SELECT COUNT(*) FROM articles"
+        with self.conn:
+            before = self.conn.execute(count_query).fetchone()[0]
+            # Known articles keep their first-seen timestamps
+            self.conn.executemany(f"""
+                INSERT INTO articles ({", ".join(self.COLUMNS)})
+                VALUES ({", ".join("?" for _ in self.COLUMNS)})
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title, summary = excluded.summary, author = excluded.author,
+                    image_url = excluded.image_url, image_sources = excluded.image_sources,
+                    tags = excluded.tags, category = excluded.category,
+                    priority = excluded.priority,
+                    related_sources = CASE WHEN excluded.related_sources = '[]'
+                                           THEN articles.related_sources ELSE excluded.related_sources END
+            """, rows)
+            added = self.conn.execute(count_query).fetchone()[0] - before
+        logger.info(f"Stored {len(rows)} articles ({added} new)")
+        return added
+
+    def iter_articles(self, since: str = "", source: str = "", category: str = "",
+                      limit: Optional[int] = None) -> Iterator[Dict]:
+        """Yield articles in to_dict() form, highest priority and newest first"""
+        clauses, params = [], []
+        if since:
+            clauses.append("published_at >= ?")
+            params.append(since)
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if category:
+            clauses.append("category = ?")
+            params.append(category)
+        query = f"SELECT {', '.join(self.COLUMNS)} FROM articles"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY priority DESC, published_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        for row in self.conn.execute(query, params):
+            yield {
+                "id": row[0],
+                "title": row[1],
+                "summary": row[2],
+                "url": row[3],
+                "source": row[4],
+                "author": row[5],
+                "publishedAt": row[6],
+                "scrapedAt": row[7],
+                "imageUrl": row[8],
+                "imageSources": json.loads(row[13]),
+                "tags": json.loads(row[9]),
+                "category": row[10],
+                "priority": row[11],
+                "relatedSources": json.loads(row[12])
+            }
+
+    def load_articles(self, **window) -> List[NewsArticle]:
+        """Load a window of the archive (see iter_articles) as NewsArticle objects"""
+        with _gc_paused():
+            return [NewsArticle.from_dict(data) for data in self.iter_articles(**window)]
+
+    def restore_remote_images(self, local_prefixes: Dict[str, str]) -> int:
+        """Point rows whose image_url starts with a local prefix back at the remote image URL"""
+        updated = 0
+        with self.conn:
+            for prefix, remote_url in local_prefixes.items():
+                updated += self.conn.execute(
+                    "UPDATE articles SET image_url = ?, image_sources = '{}' WHERE substr(image_url, 1, ?) = ?",
+                    (remote_url, len(prefix), prefix)
+                ).rowcount
+        if updated:
+            logger.info(f"Restored remote image URLs for {updated} archived articles")
+        return updated
+
+    def export_json(self, filename: str = "articles.json", extra_targets: Optional[List[str]] = None,
+                    fmt: str = "json", **window) -> int:
+        """Stream a window of the archive to the articles.json format; returns the article count"""
+        count = write_articles(self.iter_articles(**window), [filename] + (extra_targets or []), fmt=fmt)
+        logger.info(f"Exported {count} articles from the store to {filename}")
+        return count
+
+# Arabic diacritics, tatweel and (after NFKD) Latin accents and hamza/madda marks
+_SEARCH_MARKS = re.compile('[\u0300-\u036f\u0610-\u061a\u0640\u064b-\u065f\u0670\u06d6-\u06ed]')
+_SEARCH_LETTERS = str.maketrans({
+    '\u0671': '\u0627', '\u0649': '\u064a', '\u0629': '\u0647',
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)}
+})
+_SEARCH_TOKEN = re.compile(r'\w+')
+_ARABIC_ARTICLE = re.compile(r'\b(?:وال|بال|كال|فال|لل|ال)(?=\w{3})')
+_SEARCH_STOPWORDS = frozenset((
+    "the", "and", "of", "to", "in", "on", "for", "an", "is", "are", "was", "were", "with", "by", "at", "as",
+    "from", "its", "it", "that", "this", "be", "has", "have", "had", "after", "over", "into", "but", "or",
+    "في", "من", "علي", "الي", "عن", "ان", "مع", "هذا", "هذه", "التي", "الذي"
+))
+
+def normalize_search_text(text: str) -> str:
+    """Case-fold and strip accents; unify Arabic letter variants and digits"""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return _SEARCH_MARKS.sub("", text).translate(_SEARCH_LETTERS)
+
+def search_tokens(text: str) -> List[str]:
+    """Normalized index terms of a text, in the form clients must also query with"""
+    text = _ARABIC_ARTICLE.sub("", normalize_search_text(text))
+    return [token for token in _SEARCH_TOKEN.findall(text)
+            if len(token) >= SearchIndex.PREFIX_LENGTH and token not in _SEARCH_STOPWORDS]
+
+def _delta_encode(numbers: Iterable[int]) -> List[int]:
+    ordered = sorted(numbers)
+    return ordered[:1] + [number - previous for previous, number in zip(ordered, ordered[1:])]
+
+class SearchIndex:
+    """Inverted index over the published articles, written as static files.
+
+    Terms (from title, summary and tags) are sharded by their first
+    PREFIX_LENGTH characters, and each shard keeps its terms sorted, so a
+    client finds every completion of a query prefix with one small fetch
+    and a binary search. Postings are delta-encoded document numbers that
+    map to article ids through the docs file; tags, sources and categories
+    are listed as facets. State is kept between runs so only added,
+    changed or removed articles are (re)indexed and only the shards they
+    touch are rewritten. The state also holds the published manifest, and
+    copies of the files it references are kept next to ``state_path``, so
+    a fresh output directory (as on a CI runner) gets the previous
+    generation back for clients still holding its ``index.json``.
+    """
+
+    PREFIX_LENGTH = 2
+    FACETS = ("tag", "source", "category")
+
+    def __init__(self, output_dir: str = "public/search", state_path: str = ".cache/search-index.json"):
+        self.output_dir = output_dir
+        self.state_path = state_path
+        self.copy_dir = os.path.splitext(state_path)[0]
+        self.documents: Dict[str, Dict] = {}
+        self.doc_ids: List[Optional[str]] = []
+        self.postings: Dict[str, Set[int]] = {}
+        self.facets: Dict[str, Dict[str, Set[int]]] = {kind: {} for kind in self.FACETS}
+        self.manifest: Dict = {}
+        self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, 'rb') as f, _gc_paused():
+                state = _json_loads(f.read())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Rebuilding the search index, could not read {self.state_path}: {e}")
+            return
+        try:
+            with _gc_paused():
+                documents = dict(state["documents"])
+                doc_ids = list(state["docIds"])
+                postings = {term: set(docs) for term, docs in state["postings"].items()}
+                facets = {kind: {value: set(docs) for value, docs in state["facets"].get(kind, {}).items()}
+                          for kind in self.FACETS}
+                manifest = dict(state.get("manifest") or {})
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"Rebuilding the search index, {self.state_path} is malformed: {e!r}")
+            return
+        self.documents, self.doc_ids, self.postings, self.facets = documents, doc_ids, postings, facets
+        self.manifest = manifest
+
+    def _save_state(self):
+        state = {
+            "documents": self.documents,
+            "docIds": self.doc_ids,
+            "postings": {term: sorted(docs) for term, docs in self.postings.items()},
+            "facets": {kind: {value: sorted(docs) for value, docs in values.items()}
+                       for kind, values in self.facets.items()},
+            "manifest": self.manifest
+        }
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        if orjson is not None:
+            payload = orjson.dumps(state)
+        else:
+            payload = json.dumps(state, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        _atomic_write_bytes(self.state_path, payload)
+
+    @staticmethod
+    def _fingerprint(article: NewsArticle) -> str:
+        fields = "\x1f".join((article.title, article.summary, article.source, article.category, *article.tags))
+        return hashlib.md5(fields.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _document(article: NewsArticle) -> Tuple[List[str], List[List[str]]]:
+        terms = sorted(set(search_tokens(f"{article.title}\n{article.summary}\n{' '.join(article.tags)}")))
+        facets = [["tag", tag] for tag in article.tags] + [["source", article.source], ["category", article.category]]
+        return terms, facets
+
+    def _remove(self, article_id: str, dirty: Set[str]):
+        document = self.documents.pop(article_id)
+        number = document["doc"]
+        self.doc_ids[number] = None
+        for term in document["terms"]:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.discard(number)
+                if not docs:
+                    del self.postings[term]
+            dirty.add(term[:self.PREFIX_LENGTH])
+        for kind, value in document["facets"]:
+            docs = self.facets[kind].get(value)
+            if docs is not None:
+                docs.discard(number)
+                if not docs:
+                    del self.facets[kind][value]
+
+    def _add(self, article_id: str, fingerprint: str, terms: List[str], facets: List[List[str]],
+             free: List[int], dirty: Set[str]):
+        if free:
+            number = free.pop()
+            self.doc_ids[number] = article_id
+        else:
+            number = len(self.doc_ids)
+            self.doc_ids.append(article_id)
+        self.documents[article_id] = {"doc": number, "fingerprint": fingerprint, "terms": terms, "facets": facets}
+        for term in terms:
+            self.postings.setdefault(term, set()).add(number)
+            dirty.add(term[:self.PREFIX_LENGTH])
+        for kind, value in facets:
+            self.facets[kind].setdefault(value, set()).add(number)
+
+    def update(self, articles: List[NewsArticle]) -> Dict[str, int]:
+        """Bring the index in line with the published articles and rewrite changed files"""
+        current = {article.id: article for article in articles}
+        dirty: Set[str] = set()
+        counts = {"added": 0, "updated": 0, "removed": 0}
+
+        for article_id in [article_id for article_id in self.documents if article_id not in current]:
+            self._remove(article_id, dirty)
+            counts["removed"] += 1
+        # Reuse freed document numbers so the docs table stays dense
+        free = sorted((number for number, article_id in enumerate(self.doc_ids) if article_id is None), reverse=True)
+        for article_id, article in current.items():
+            fingerprint = self._fingerprint(article)
+            known = self.documents.get(article_id)
+            if known is not None:
+                if known["fingerprint"] == fingerprint:
+                    continue
+                self._remove(article_id, dirty)
+                free.append(known["doc"])
+                counts["updated"] += 1
+            else:
+                counts["added"] += 1
+            self._add(article_id, fingerprint, *self._document(article), free, dirty)
+        while self.doc_ids and self.doc_ids[-1] is None:
+            self.doc_ids.pop()
+
+        counts["shards_written"] = self._write(dirty, changed=any(counts.values()))
+        self._save_state()
+        logger.info(f"Search index: {counts['added']} added, {counts['updated']} updated, "
+                    f"{counts['removed']} removed, {counts['shards_written']} term shards rewritten")
+        return counts
+
+    def _write_file(self, name: str, content: Dict) -> str:
+        payload = json.dumps(content, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        path = f"{name}.{hashlib.sha256(payload).hexdigest()[:12]}.json"
+        if not os.path.exists(os.path.join(self.output_dir, path)):
+            _write_precompressed(os.path.join(self.output_dir, path), payload)
+        if not os.path.exists(os.path.join(self.copy_dir, path)):
+            _atomic_write_bytes(os.path.join(self.copy_dir, path), payload)
+        return path
+
+    def _restore(self, path: str):
+        """Publish a file the previous manifest references again from its copy, if it went missing"""
+        if os.path.exists(os.path.join(self.output_dir, path)):
+            return
+        try:
+            with open(os.path.join(self.copy_dir, path), 'rb') as f:
+                _write_precompressed(os.path.join(self.output_dir, path), f.read())
+        except OSError:
+            pass
+
+    def _write(self, dirty: Set[str], changed: bool) -> int:
+        manifest_path = os.path.join(self.output_dir, "index.json")
+        for directory in (self.output_dir, self.copy_dir):
+            os.makedirs(os.path.join(directory, "terms"), exist_ok=True)
+        previous: Dict = self.manifest
+        if not previous:
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    previous = json.load(f)
+            except (OSError, ValueError):
+                pass
+        for path in (previous.get("docs"), previous.get("facets"), *previous.get("shards", {}).values()):
+            if path:
+                self._restore(path)
+
+        shard_terms: Dict[str, List[str]] = {}
+        for term in self.postings:
+            shard_terms.setdefault(term[:self.PREFIX_LENGTH], []).append(term)
+        shards = {key: path for key, path in previous.get("shards", {}).items()
+                  if key in shard_terms and os.path.exists(os.path.join(self.output_dir, path))}
+        dirty = (dirty & shard_terms.keys()) | (shard_terms.keys() - shards.keys())
+        for key in dirty:
+            terms = sorted(shard_terms[key])
+            shards[key] = self._write_file(f"terms/{key.encode('utf-8').hex()}", {
+                "terms": terms,
+                "postings": [_delta_encode(self.postings[term]) for term in terms]
+            })
+
+        docs_path, facets_path = previous.get("docs"), previous.get("facets")
+        if changed or not all(path and os.path.exists(os.path.join(self.output_dir, path))
+                              for path in (docs_path, facets_path)):
+            docs_path = self._write_file("docs", {"ids": self.doc_ids})
+            facets_path = self._write_file("facets", {
+                kind: {value: _delta_encode(docs) for value, docs in sorted(values.items())}
+                for kind, values in self.facets.items()
+            })
+
+        manifest = {
+            "version": 1,
+            "lastUpdated": datetime.now(timezone.utc).isoformat(),
+            "totalDocuments": len(self.documents),
+            "prefixLength": self.PREFIX_LENGTH,
+            "docs": docs_path,
+            "facets": facets_path,
+            "shards": dict(sorted(shards.items()))
+        }
+        _write_precompressed(manifest_path, json.dumps(manifest, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+        self.manifest = manifest
+
+        # Keep files the previous manifest referenced for clients still using it
+        keep = {docs_path, facets_path, *shards.values(),
+                previous.get("docs"), previous.get("facets"), *previous.get("shards", {}).values()}
+        for root in (self.output_dir, self.copy_dir):
+            for directory in (root, os.path.join(root, "terms")):
+                for name in os.listdir(directory):
+                    relative = os.path.relpath(os.path.join(directory, name), root).replace(os.sep, "/")
+                    base = relative[:-3] if relative.endswith((".gz", ".br")) else relative
+                    if base.endswith(".json") and base != "index.json" and base not in keep:
+                        os.remove(os.path.join(directory, name))
+        return len(dirty)
+
+class DeltaFeed:
+    """Versioned changes between runs, so clients can poll kilobytes.
+
+    Each run whose articles differ from the previous run's gets a version
+    and a delta file with the added and updated records and the removed ids.
+    ``latest.json`` names the current version, the retained deltas and a
+    snapshot of the full set. Only the newest ``max_deltas`` deltas are
+    kept, and once the snapshot falls further behind than that a new one
+    is written. A client at version v applies the deltas after v when they
+    are all listed, and otherwise loads the snapshot and the deltas after it.
+
+    The published pointer and copies of the files it references are kept
+    next to ``state_path``, so a fresh output directory (as on a CI runner)
+    is filled back in and versions keep counting up. A new history starts
+    at the current Unix time, so it never reuses a version an earlier one
+    already published.
+    """
+
+    def __init__(self, output_dir: str = "public/updates", state_path: str = ".cache/delta-feed.json",
+                 max_deltas: int = 48):
+        self.output_dir = output_dir
+        self.state_path = state_path
+        self.copy_dir = os.path.splitext(state_path)[0]
+        self.max_deltas = max(1, max_deltas)
+        self.fingerprints: Dict[str, str] = {}
+        self.latest: Dict = {}
+        try:
+            with open(self.state_path, 'rb') as f:
+                state = _json_loads(f.read())
+            self.fingerprints = state["fingerprints"]
+            self.latest = state["latest"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Without the published history the fingerprints cannot be trusted
+            logger.warning(f"Starting a new delta history, could not read {self.state_path}: {e}")
+            self.fingerprints, self.latest = {}, {}
+
+    @staticmethod
+    def _fingerprint(record: Dict) -> str:
+        return hashlib.md5(json.dumps(record, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def _write_file(self, kind: str, version: int, content: Dict) -> str:
+        payload = json.dumps(content, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        path = f"{kind}/{version}.{hashlib.sha256(payload).hexdigest()[:12]}.json"
+        for directory in (self.output_dir, self.copy_dir):
+            os.makedirs(os.path.join(directory, kind), exist_ok=True)
+        _write_precompressed(os.path.join(self.output_dir, path), payload)
+        _atomic_write_bytes(os.path.join(self.copy_dir, path), payload)
+        return path
+
+    def _restore(self, path: str) -> bool:
+        """Make sure a referenced file is published, copying it back from the state if needed"""
+        if os.path.exists(os.path.join(self.output_dir, path)):
+            return True
+        try:
+            with open(os.path.join(self.copy_dir, path), 'rb') as f:
+                payload = f.read()
+        except OSError:
+            logger.warning(f"Delta feed file {path} is gone; dropping it from latest.json")
+            return False
+        os.makedirs(os.path.dirname(os.path.join(self.output_dir, path)), exist_ok=True)
+        _write_precompressed(os.path.join(self.output_dir, path), payload)
+        return True
+
+    def _write_latest(self, latest: Dict):
+        _write_precompressed(os.path.join(self.output_dir, "latest.json"),
+                             json.dumps(latest, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
+    def publish(self, articles: List[NewsArticle]) -> Dict[str, int]:
+        """Compare against the previous run by article id and write a new version if anything changed"""
+        records = {article.id: article.to_dict() for article in articles}
+        fingerprints = {article_id: self._fingerprint(record) for article_id, record in records.items()}
+        added = [records[article_id] for article_id in fingerprints if article_id not in self.fingerprints]
+        updated = [records[article_id] for article_id, fingerprint in fingerprints.items()
+                   if self.fingerprints.get(article_id, fingerprint) != fingerprint]
+        removed = [article_id for article_id in self.fingerprints if article_id not in fingerprints]
+        counts = {"added": len(added), "updated": len(updated), "removed": len(removed)}
+
+        snapshot = self.latest.get("snapshot")
+        if snapshot is not None and not self._restore(snapshot["path"]):
+            snapshot = None
+        deltas = [delta for delta in self.latest.get("deltas", []) if self._restore(delta["path"])]
+        if self.latest and not any(counts.values()):
+            if snapshot is not None:
+                if not os.path.exists(os.path.join(self.output_dir, "latest.json")):
+                    self._write_latest(self.latest)
+                counts["version"] = self.latest["version"]
+                return counts
+            # The snapshot is lost, so the current set needs a version of its own
+
+        version = self.latest["version"] + 1 if self.latest else int(time.time())
+        generated_at = datetime.now(timezone.utc).isoformat()
+        if snapshot is not None and self.fingerprints:
+            deltas.append({"version": version, "path": self._write_file("deltas", version, {
+                "version": version,
+                "previous": version - 1,
+                "generatedAt": generated_at,
+                "added": added,
+                "updated": updated,
+                "removed": removed
+            })})
+        if snapshot is None or not self.fingerprints or version - snapshot["version"] > self.max_deltas:
+            snapshot = {"version": version, "path": self._write_file("snapshots", version, {
+                "version": version,
+                "generatedAt": generated_at,
+                "articles": list(records.values())
+            })}
+        if not self.fingerprints:
+            deltas = []
+        deltas = deltas[-self.max_deltas:]
+
+        latest = {
+            "version": version,
+            "lastUpdated": generated_at,
+            "totalArticles": len(records),
+            "snapshot": snapshot,
+            "deltas": deltas
+        }
+        self._write_latest(latest)
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        _atomic_write_bytes(self.state_path, json.dumps({"fingerprints": fingerprints, "latest": latest},
+                                                        separators=(',', ':')).encode('utf-8'))
+
+        # Keep what the previous pointer referenced for clients still reading it
+        keep = {entry["path"] for pointer in (latest, self.latest) if pointer
+                for entry in [pointer["snapshot"], *pointer["deltas"]]}
+        for root in (self.output_dir, self.copy_dir):
+            for kind in ("deltas", "snapshots"):
+                directory = os.path.join(root, kind)
+                for name in os.listdir(directory) if os.path.isdir(directory) else []:
+                    base = name[:-3] if name.endswith((".gz", ".br")) else name
+                    if base.endswith(".json") and f"{kind}/{base}" not in keep:
+                        os.remove(os.path.join(directory, name))
+
+        self.latest, self.fingerprints = latest, fingerprints
+        counts["version"] = version
+        logger.info(f"Delta feed version {version}: {counts['added']} added, {counts['updated']} updated, "
+                    f"{counts['removed']} removed")
+        return counts
+
+def _slugify(value: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', value.lower()).strip('-') or "source"
+
+def _write_precompressed(path: str, payload: bytes):
+    """Atomically write a file along with .gz (and .br when brotli is installed) variants"""
+    _atomic_write_bytes(f"{path}.gz", gzip.compress(payload, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _atomic_write_bytes(f"{path}.br", brotli.compress(payload))
+    _atomic_write_bytes(path, payload)
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp, treating unparseable values as very old"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.min.replace(tzinfo=timezone.utc)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scrape Palestinian news sources")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="number of sources fetched in parallel (1 = sequential)")
+    parser.add_argument("--host-interval", type=float, default=2.0,
+                        help="minimum seconds between requests to the same host")
+    parser.add_argument("--connect-timeout", type=float, default=5, help="seconds to establish a connection")
+    parser.add_argument("--read-timeout", type=float, default=10, help="seconds to wait between bytes of a response")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="retries for connection errors, timeouts and 429/5xx responses")
+    parser.add_argument("--backoff", type=float, default=0.5, help="base of the jittered exponential retry delay")
+    parser.add_argument("--time-budget", type=float, default=0,
+                        help="seconds a scrape run may take before returning partial results (0: unlimited)")
+    parser.add_argument("--circuit-state", default=".cache/circuit-breaker.json",
+                        help="where per-source failure counts are kept between runs")
+    parser.add_argument("--circuit-threshold", type=int, default=3,
+                        help="consecutive failed runs before a source is skipped (0 disables the circuit breaker)")
+    parser.add_argument("--circuit-cooldown", type=float, default=1800,
+                        help="seconds a failing source is skipped, doubling while it keeps failing")
+    parser.add_argument("--no-early-stop", action="store_true",
+                        help="download and parse whole source pages instead of stopping after the candidates")
+    parser.add_argument("--max-page-bytes", type=int, default=2 * 1024 * 1024,
+                        help="with early stop, stop reading a source page after this many bytes")
+    parser.add_argument("--cache-dir", default=".cache/http",
+                        help="directory for the conditional-GET page cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always refetch and reparse every source page")
+    parser.add_argument("--no-feeds", action="store_true",
+                        help="ignore RSS/Atom feeds and always scrape the HTML pages")
+    parser.add_argument("--parser", default=DEFAULT_PARSER, choices=["lxml", "html.parser"],
+                        help="BeautifulSoup parser backend (lxml is used when installed)")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1,
+                        help="processes used for HTML parsing (0 = parse in the fetch threads)")
+    parser.add_argument("--near-duplicate-threshold", type=float, default=0.7,
+                        help="title similarity (Jaccard) above which stories are merged (0 disables)")
+    parser.add_argument("--output", default="articles.json",
+                        help="JSON file to write the articles to")
+    parser.add_argument("--also-write", action="append", default=[], metavar="FILE",
+                        help="write the same output to another file in the same pass (repeatable)")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json",
+                        help="output format: the articles.json document or one article per line")
+    parser.add_argument("--full", action="store_true",
+                        help="rebuild the output from this run only instead of merging into it")
+    parser.add_argument("--max-age-days", type=float, default=7,
+                        help="drop merged articles published longer ago than this")
+    parser.add_argument("--max-articles", type=int, default=500,
+                        help="maximum number of articles kept in the output")
+    parser.add_argument("--seen-state", default=".cache/seen.json",
+                        help="first-seen timestamps of scraped articles, so evicted ones do not return as new")
+    parser.add_argument("--db",
+                        help="SQLite archive to upsert into; the JSON output is then exported from it")
+    parser.add_argument("--sharded-dir",
+                        help="also write a manifest and precompressed per-source/per-day shards here")
+    parser.add_argument("--shard-cache", default=".cache/shards",
+                        help="copies of the current and previous shards, restored into a fresh --sharded-dir")
+    parser.add_argument("--search-index", metavar="DIR",
+                        help="also write a prefix-sharded inverted search index here (e.g. public/search)")
+    parser.add_argument("--search-state", default=".cache/search-index.json",
+                        help="where the search index keeps its state for incremental updates")
+    parser.add_argument("--delta-dir", metavar="DIR",
+                        help="also write versioned deltas between runs plus a latest.json pointer (e.g. public/updates)")
+    parser.add_argument("--delta-state", default=".cache/delta-feed.json",
+                        help="what was last published; copies of its files go in a directory beside it")
+    parser.add_argument("--max-deltas", type=int, default=48,
+                        help="deltas kept before they are compacted into a new snapshot")
+    parser.add_argument("--thumbs-dir", metavar="DIR",
+                        help="serve article images as local WebP/AVIF thumbnails written here (e.g. public/thumbs)")
+    parser.add_argument("--thumbs-url", default="/thumbs", help="URL path the thumbnails directory is served at")
+    parser.add_argument("--thumb-widths", type=lambda value: [int(width) for width in value.split(',')],
+                        default=[320, 640, 960], help="comma-separated thumbnail widths in pixels")
+    parser.add_argument("--image-cache", default=".cache/images",
+                        help="where downloaded images are kept by content hash")
+    parser.add_argument("--report",
+                        help="write a JSON report of per-source timings and counters to this file")
+    parser.add_argument("--prometheus",
+                        help="write per-source metrics in Prometheus textfile format to this file")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and poll each source on its own adaptive schedule")
+    parser.add_argument("--poll-interval", type=float, default=900,
+                        help="initial seconds between polls of a source in daemon mode")
+    parser.add_argument("--min-interval", type=float, default=300,
+                        help="shortest polling interval for busy sources in daemon mode")
+    parser.add_argument("--max-interval", type=float, default=7200,
+                        help="longest polling interval for quiet sources in daemon mode")
+    parser.add_argument("--schedule-state", default=".cache/schedule.json",
+                        help="where daemon mode remembers learned polling intervals")
+    parser.add_argument("--enrich", action="store_true",
+                        help="fetch new article pages for summary, author, date and image")
+    parser.add_argument("--enrich-workers", type=int, default=4,
+                        help="article pages fetched in parallel during enrichment")
+    parser.add_argument("--enrich-cache", default=".cache/enrich.json",
+                        help="per-URL cache of article page metadata")
+    return parser.parse_args(argv)
+
+def publish_articles(scraper: NewsScraper, articles: List[NewsArticle],
+                     args: argparse.Namespace) -> List[NewsArticle]:
+    """Merge freshly scraped articles into the archive and write every configured output"""
+    thumbnails = ThumbnailPipeline(scraper, args.thumbs_dir, args.thumbs_url, args.image_cache,
+                                   widths=tuple(args.thumb_widths)) if args.thumbs_dir else None
+    if args.db:
+        # The store is the system of record; the JSON is a window of it
+        since = (datetime.now(timezone.utc) - timedelta(days=args.max_age_days)).isoformat()
+        with ArticleStore(args.db) as store:
+            store.upsert(articles)
+            if thumbnails is not None:
+                store.upsert(thumbnails.process(store.load_articles(since=since, limit=args.max_articles)))
+                # Rows outside the window keep no thumbnails, so they get their remote image back
+                store.restore_remote_images(thumbnails.evicted)
+            store.export_json(args.output, extra_targets=args.also_write, fmt=args.format,
+                              since=since, limit=args.max_articles)
+            articles = store.load_articles(since=since, limit=args.max_articles)
+    else:
+        if not args.full:
+            previous = scraper.load_articles_from_json(args.output)
+            first_seen = {}
+            try:
+                with open(args.seen_state, 'rb') as f:
+                    first_seen = _json_loads(f.read())
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not read first-seen timestamps from {args.seen_state}: {e}")
+            articles = scraper.merge_articles(articles, previous, max_age_days=args.max_age_days,
+                                              max_articles=args.max_articles, first_seen=first_seen)
+            os.makedirs(os.path.dirname(args.seen_state) or ".", exist_ok=True)
+            _atomic_write_bytes(args.seen_state, json.dumps(first_seen, separators=(',', ':')).encode('utf-8'))
 
-def main():
-    """Main function to run the scraper"""
-    scraper = NewsScraper()
-    
-    logger.info("Starting news scraping...")
-    articles = scraper.scrape_all_sources()
-    
-    if articles:
         # Sort by priority and publication date
         articles.sort(key=lambda x: (x.priority, x.published_at), reverse=True)
+        if thumbnails is not None:
+            articles = thumbnails.process(articles)
         
         # Save to JSON
-        scraper.save_articles_to_json(articles)
-        
-        # Print summary
-        sources = {}
-        for article in articles:
-            sources[article.source] = sources.get(article.source, 0) + 1
-        
-        print("\n=== Scraping Summary ===")
-        for source, count in sources.items():
-            print(f"{source}: {count} articles")
-        print(f"Total: {len(articles)} articles")
-    else:
-        logger.warning("No articles were scraped")
+        scraper.save_articles_to_json(articles, args.output, extra_targets=args.also_write, fmt=args.format)
+    if args.sharded_dir:
+        scraper.save_sharded_output(articles, args.sharded_dir, args.shard_cache)
+    if args.search_index:
+        SearchIndex(args.search_index, args.search_state).update(articles)
+    if args.delta_dir:
+        DeltaFeed(args.delta_dir, args.delta_state, args.max_deltas).publish(articles)
+    return articles
+
+def write_metrics(scraper: NewsScraper, args: argparse.Namespace, started_at: str, duration: float,
+                  total_articles: int):
+    if args.report:
+        write_run_report(list(scraper.metrics.values()), args.report, started_at, duration, total_articles)
+    if args.prometheus:
+        write_prometheus_textfile(list(scraper.metrics.values()), args.prometheus, duration, total_articles)
+
+class SourceSchedule:
+    """Adaptive polling interval for one source in daemon mode.
+
+    The interval halves when a poll finds new or removed articles and grows
+    by half when nothing changed, within [min_interval, max_interval].
+    """
+
+    def __init__(self, interval: float, min_interval: float, max_interval: float):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(interval, min_interval), max_interval)
+        self.next_run = 0.0
+        self.last_ids: Optional[Set[str]] = None
+
+    def record(self, ids: Set[str], now: float) -> bool:
+        """Update the interval from a poll result and return whether the source changed"""
+        changed = ids != self.last_ids
+        if self.last_ids is not None:
+            factor = 0.5 if changed else 1.5
+            self.interval = min(max(self.interval * factor, self.min_interval), self.max_interval)
+        self.last_ids = ids
+        self.next_run = now + self.interval
+        return changed
+
+    def postpone(self, now: float):
+        """Retry a failed or empty poll after the current interval without adapting it"""
+        self.next_run = now + self.interval
+
+def run_daemon(scraper: NewsScraper, args: argparse.Namespace):
+    """Keep polling sources on their own adaptive schedules until interrupted.
+
+    Sessions, caches and the parser pool stay warm between polls, and the
+    outputs are only rewritten when some source's article set changed.
+    """
+    schedules = {source.key: SourceSchedule(args.poll_interval, args.min_interval, args.max_interval)
+                 for source in scraper.sources}
+    try:
+        with open(args.schedule_state, 'r', encoding='utf-8') as f:
+            for key, interval in json.load(f).items():
+                if key in schedules:
+                    schedules[key].interval = min(max(interval, args.min_interval), args.max_interval)
+    except (OSError, ValueError):
+        pass
+
+    enricher = ArticleEnricher(scraper, cache_path=args.enrich_cache,
+                               max_workers=args.enrich_workers) if args.enrich else None
+    latest: Dict[str, List[NewsArticle]] = {}
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    logger.info(f"Daemon started for {len(scraper.sources)} sources")
+
+    try:
+        while not stop.is_set():
+            now = time.monotonic()
+            due = [source for source in scraper.sources if schedules[source.key].next_run <= now]
+            if due:
+                started_at = datetime.now(timezone.utc).isoformat()
+                results = scraper.scrape_sources(due)
+                changed = False
+                for source in due:
+                    schedule = schedules[source.key]
+                    articles = results[source.key]
+                    if not articles:
+                        schedule.postpone(now)
+                        continue
+                    if schedule.record({article.id for article in articles}, now):
+                        changed = True
+                        latest[source.key] = articles
+                    logger.info(f"{source.name}: next poll in {schedule.interval / 60:.1f} min")
+
+                combined = scraper.deduplicate([article for articles in latest.values() for article in articles])
+                write_metrics(scraper, args, started_at, time.monotonic() - now, len(combined))
+                if changed:
+                    if enricher is not None:
+                        combined = enricher.enrich(combined)
+                    published = publish_articles(scraper, combined, args)
+                    logger.info(f"Published {len(published)} articles")
+                else:
+                    logger.info("No source changed, outputs left untouched")
+
+                os.makedirs(os.path.dirname(args.schedule_state) or ".", exist_ok=True)
+                _atomic_write_bytes(args.schedule_state, json.dumps(
+                    {key: schedule.interval for key, schedule in schedules.items()}).encode('utf-8'))
+
+            next_due = min(schedule.next_run for schedule in schedules.values())
+            stop.wait(max(1.0, next_due - time.monotonic()))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Daemon stopping")
+
+def main(argv: Optional[List[str]] = None):
+    """Main function to run the scraper"""
+    args = parse_args(argv)
+    http_cache = None if args.no_cache else HTTPCache(args.cache_dir)
+    circuit_breaker = CircuitBreaker(args.circuit_state, args.circuit_threshold,
+                                     args.circuit_cooldown) if args.circuit_threshold > 0 else None
+    scraper = NewsScraper(max_workers=args.workers, host_interval=args.host_interval,
+                          connect_timeout=args.connect_timeout, read_timeout=args.read_timeout,
+                          http_cache=http_cache, parser=args.parser, parse_workers=args.parse_workers,
+                          near_duplicate_threshold=args.near_duplicate_threshold,
+                          use_feeds=not args.no_feeds, retries=args.retries, backoff=args.backoff,
+                          circuit_breaker=circuit_breaker, time_budget=args.time_budget,
+                          early_stop=not args.no_early_stop, max_page_bytes=args.max_page_bytes)
+
+    if args.daemon:
+        try:
+            run_daemon(scraper, args)
+        finally:
+            scraper.close()
+        return
+    
+    logger.info("Starting news scraping...")
+    started_at = datetime.now(timezone.utc).isoformat()
+    started = time.monotonic()
+    try:
+        articles = scraper.scrape_all_sources()
+        if articles and args.enrich:
+            enricher = ArticleEnricher(scraper, cache_path=args.enrich_cache, max_workers=args.enrich_workers)
+            articles = enricher.enrich(articles)
+        duration = time.monotonic() - started
+        logger.info(f"Scraping finished in {duration:.1f}s")
+        write_metrics(scraper, args, started_at, duration, len(articles))
+
+        if articles:
+            # Still fetches (thumbnails), so the scraper stays open until this is done
+            articles = publish_articles(scraper, articles, args)
+
+            # Print summary
+            sources = {}
+            for article in articles:
+                sources[article.source] = sources.get(article.source, 0) + 1
+
+            print("\n=== Scraping Summary ===")
+            for source, count in sources.items():
+                print(f"{source}: {count} articles")
+            print(f"Total: {len(articles)} articles")
+        else:
+            logger.warning("No articles were scraped")
+    finally:
+        scraper.close()
 
 if __name__ == "__main__":
     main()
-
@@ -10,9 +10,52 @@ import palestineFlag from './assets/palestine-flag.png';
 
 // Data service to load articles
 class ArticleService {
+  // Shards have content-hashed names, so a path always holds the same articles
+  static shardCache = new Map();
+
+  static async loadShard(path) {
+    if (!ArticleService.shardCache.has(path)) {
+      const response = await fetch(`/data/${path}`);
+      if (!response.ok) {
+        throw new Error(`Could not load shard ${path}`);
+      }
+      ArticleService.shardCache.set(path, (await response.json()).articles || []);
+    }
+    return ArticleService.shardCache.get(path);
+  }
+
+  // Load the per-source/per-day shards listed in the manifest; on refresh
+  // only the small manifest and shards that changed are downloaded
+  static async loadSharded() {
+    const response = await fetch('/data/manifest.json', { cache: 'no-cache' });
+    if (!response.ok) {
+      return null;
+    }
+    const manifest = await response.json();
+    const paths = manifest.shards.map(shard => shard.path);
+    const shards = await Promise.all(paths.map(path => ArticleService.loadShard(path)));
+    for (const path of ArticleService.shardCache.keys()) {
+      if (!paths.includes(path)) {
+        ArticleService.shardCache.delete(path);
+      }
+    }
+    // Same order as articles.json: priority, then publication date
+    return shards.flat().sort((a, b) =>
+      (b.priority - a.priority) || b.publishedAt.localeCompare(a.publishedAt)
+    );
+  }
+
   static async loadArticles() {
     try {
-      // In a real deployment, this would fetch from an API or updated JSON file
+      const sharded = await ArticleService.loadSharded();
+      if (sharded) {
+        return sharded;
+      }
+    } catch (error) {
+      console.warn('Could not load sharded articles, falling back to articles.json');
+    }
+
+    try {
       const response = await fetch('/articles.json');
       if (response.ok) {
         const data = await response.json();
@@ -21,7 +64,7 @@ class ArticleService {
     } catch (error) {
       console.warn('Could not load live articles, using mock data');
     }
-    
+
     // Fallback to mock data
     return [
       {
@@ -388,11 +431,18 @@ function App() {
                 onClick={() => handleArticleClick(article)}
               >
                 <div className="relative overflow-hidden">
-                  <img
-                    src={article.imageUrl || newsBg}
-                    alt={article.title}
-                    className="w-full h-48 object-cover image-hover-scale"
-                  />
+                  <picture>
+                    {Object.entries(article.imageSources || {}).map(([type, srcSet]) => (
+                      <source key={type} type={type} srcSet={srcSet} sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw" />
+                    ))}
+                    <img
+                      src={article.imageUrl || newsBg}
+                      alt={article.title}
+                      loading="lazy"
+                      decoding="async"
+                      className="w-full h-48 object-cover image-hover-scale"
+                    />
+                  </picture>
                   <div className="absolute top-4 left-4">
                     <Badge className={`${getPriorityColor(article.priority)} text-white`}>
                       {article.category}